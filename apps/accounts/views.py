@@ -1,13 +1,21 @@
 from allauth.account.views import PasswordChangeView as AllauthPasswordChangeView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import Count
+from django.db.models import Max
 from django.db.models import Prefetch
+from django.db.models import Value
+from django.db.models.functions import Greatest
 from django.urls import reverse_lazy
 from django.utils.translation import gettext as _
 from django.views.generic import ListView
 from django.views.generic import UpdateView
 
+from apps.core.viewmixins import ConditionalGetMixin
+from apps.core.viewmixins import CursorPaginationMixin
 from apps.core.viewmixins import HtmxTemplateMixin
+from apps.orders.models import ArchivedOrder
+from apps.orders.models import ArchivedOrderItem
 from apps.orders.models import Order
 from apps.orders.models import OrderItem
 
@@ -56,6 +64,8 @@ class PasswordUpdateView(
 class OrderListView(
     HtmxTemplateMixin,
     LoginRequiredMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
     ListView,
 ):
     model = Order
@@ -63,17 +73,47 @@ class OrderListView(
     htmx_template_name = "accounts/partials/order_list_table.html"
     context_object_name = "orders"
     paginate_by = 7
+    preview_items_count = 3
 
-    def get_queryset(self):
-        return (
-            super()
-            .get_queryset()
-            .filter(user=self.request.user)
-            .select_related("user")
-            .prefetch_related(
-                Prefetch(
-                    "items",
-                    queryset=OrderItem.objects.select_related("product"),
-                ),
-            )
+    def with_item_previews(self, queryset, item_model):
+        return queryset.annotate(
+            more_items_count=Greatest(
+                queryset.line_count_expression() - Value(self.preview_items_count),
+                Value(0),
+            ),
+        ).prefetch_related(
+            Prefetch(
+                "items",
+                queryset=item_model.objects.select_related("product")[
+                    : self.preview_items_count
+                ],
+                to_attr="preview_items",
+            ),
+        )
+
+    def get_validators(self):
+        live_orders, archived_orders = (
+            model.objects.filter(user=self.request.user)
+            .order_by()
+            .values("user")
+            .annotate(last_modified=Max("modified"), count=Count("pk"))
+            .values_list("last_modified", "count")
+            for model in (Order, ArchivedOrder)
         )
+        # Archiving moves orders between tables, so the counts are part of
+        # the validator too.
+        rows = sorted(live_orders.union(archived_orders, all=True))
+        last_modified = max((modified for modified, _ in rows), default=None)
+        return last_modified, rows
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user=self.request.user)
+        return self.with_item_previews(queryset, OrderItem)
+
+    def get_cursor_querysets(self, queryset):
+        # Archived orders are still part of the customer's history.
+        archived_orders = ArchivedOrder.objects.filter(user=self.request.user)
+        return [
+            queryset,
+            self.with_item_previews(archived_orders, ArchivedOrderItem),
+        ]
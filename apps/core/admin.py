@@ -0,0 +1,48 @@
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .choices import JobStatus
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "task",
+        "status",
+        "attempts",
+        "run_after",
+        "created",
+    ]
+    list_filter = [
+        "status",
+        "task",
+    ]
+    readonly_fields = [
+        "task",
+        "payload",
+        "status",
+        "attempts",
+        "run_after",
+        "last_error",
+        "created",
+        "modified",
+    ]
+    actions = [
+        "retry",
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description=_("Executar novamente as tarefas selecionadas"))
+    def retry(self, request, queryset):
+        queryset.update(
+            status=JobStatus.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+        )
@@ -0,0 +1,80 @@
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.urls import path
+from django.utils.translation import gettext_lazy as _
+
+from .exports import EXPORT_FORMATS
+from .exports import get_export_response
+
+
+class ExportMixin:
+    change_list_template = "admin/export_change_list.html"
+    export_fields = []
+    export_chunk_size = 2000
+    export_filename = None
+
+    def get_urls(self):
+        opts = self.model._meta  # noqa: SLF001
+        return [
+            path(
+                "export/<str:export_format>/",
+                self.admin_site.admin_view(self.export_view),
+                name=f"{opts.app_label}_{opts.model_name}_export",
+            ),
+            *super().get_urls(),
+        ]
+
+    def get_export_fields(self):
+        return self.export_fields
+
+    def get_export_filename(self):
+        return self.export_filename or self.model._meta.model_name  # noqa: SLF001
+
+    def get_export_rows(self, queryset):
+        lookups = [lookup for lookup, label in self.get_export_fields()]
+        return queryset.values_list(*lookups).iterator(
+            chunk_size=self.export_chunk_size,
+        )
+
+    def get_export_response(self, queryset, export_format):
+        compress = export_format.endswith(".gz")
+        export_format = export_format.removesuffix(".gz")
+        if export_format not in EXPORT_FORMATS:
+            raise Http404
+        if export_format == "csv":
+            header = [str(label) for lookup, label in self.get_export_fields()]
+        else:
+            header = [lookup for lookup, label in self.get_export_fields()]
+        return get_export_response(
+            header,
+            self.get_export_rows(queryset),
+            filename=self.get_export_filename(),
+            export_format=export_format,
+            compress=compress,
+        )
+
+    def export_view(self, request, export_format):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        changelist = self.get_changelist_instance(request)
+        queryset = changelist.get_queryset(request)
+        return self.get_export_response(queryset, export_format)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if self.has_view_permission(request):
+            for export_format in EXPORT_FORMATS:
+                name = f"export_as_{export_format}"
+                actions[name] = (
+                    self._make_export_action(export_format),
+                    name,
+                    _("Exportar selecionados (%(format)s)")
+                    % {"format": export_format.upper()},
+                )
+        return actions
+
+    def _make_export_action(self, export_format):
+        def export_action(modeladmin, request, queryset):
+            return modeladmin.get_export_response(queryset, export_format)
+
+        return export_action
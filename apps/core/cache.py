@@ -0,0 +1,295 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+from redis.exceptions import RedisError
+
+VERSION_KEY_PREFIX = "twotier"
+MISSING = object()
+
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+class LocalTier:
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.stats = {
+            "local": {"hits": 0, "misses": 0},
+            "redis": {"hits": 0, "misses": 0},
+        }
+
+    def record(self, tier, *, hit):
+        with self.lock:
+            self.stats[tier]["hits" if hit else "misses"] += 1
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at, namespace, version = entry
+                if expires_at > time.monotonic() and version == self.versions.get(
+                    namespace,
+                ):
+                    self.entries.move_to_end(key)
+                    self.stats["local"]["hits"] += 1
+                    return pickle.loads(value)  # noqa: S301
+                del self.entries[key]
+            self.stats["local"]["misses"] += 1
+        return MISSING
+
+    def set(self, key, value, namespace, version, timeout=None):
+        if timeout is not None and timeout <= 0:
+            return
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        # Values are pickled, like LocMemCache does, so callers never share a
+        # mutable object.
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + timeout, namespace, version)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def bump(self, namespace, version, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+            known = self.versions.get(namespace)
+            if version is not None and known is not None and version == known + 1:
+                # Nobody else wrote to the namespace since it was last seen, so
+                # the other local entries are still current.
+                for key, (value, expires_at, entry_namespace, entry_version) in list(
+                    self.entries.items(),
+                ):
+                    if entry_namespace == namespace and entry_version == known:
+                        self.entries[key] = (value, expires_at, namespace, version)
+            self.versions[namespace] = version
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TwoTierCache(RedisCache):
+    # Keys are grouped in namespaces by the text before their first colon.
+    # Every write bumps the namespace's version key in Redis, and each process
+    # polls those versions to drop local copies that other workers replaced.
+    # Keys in WRITE_ONCE_NAMESPACES never change value once written (they
+    # embed whatever they depend on), so writing them bumps nothing.
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get("OPTIONS", {})
+        namespaces = options.get("LOCAL_NAMESPACES")
+        self.local_namespaces = set(namespaces) if namespaces is not None else None
+        self.write_once_namespaces = set(options.get("WRITE_ONCE_NAMESPACES", ()))
+        self.version_check_interval = options.get("VERSION_CHECK_INTERVAL", 1)
+        # Django creates a cache instance per thread; the local tier is shared
+        # by the whole process.
+        name = (server, self.key_prefix)
+        with _local_tiers_lock:
+            if name not in _local_tiers:
+                _local_tiers[name] = LocalTier(
+                    options.get("LOCAL_MAX_ENTRIES", 1000),
+                    options.get("LOCAL_TIMEOUT", 60),
+                )
+            self.local = _local_tiers[name]
+
+    def get_namespace(self, key):
+        namespace, separator, _ = str(key).partition(":")
+        if not separator or namespace == VERSION_KEY_PREFIX:
+            return None
+        if self.local_namespaces is not None and namespace not in self.local_namespaces:
+            return None
+        return namespace
+
+    def get_version_key(self, namespace):
+        return f"{VERSION_KEY_PREFIX}:{namespace}"
+
+    def refresh_versions(self):
+        now = time.monotonic()
+        if now - self.local.checked_at < self.version_check_interval:
+            return
+        self.local.checked_at = now
+        namespaces = list(self.local.versions)
+        if not namespaces:
+            return
+        version_keys = {
+            self.get_version_key(namespace): namespace for namespace in namespaces
+        }
+        versions = super().get_many(list(version_keys))
+        with self.local.lock:
+            for version_key, namespace in version_keys.items():
+                self.local.versions[namespace] = versions.get(version_key, 0)
+
+    def get_namespace_version(self, namespace):
+        version = self.local.versions.get(namespace, MISSING)
+        if version is MISSING:
+            version = super().get(self.get_version_key(namespace), 0)
+            with self.local.lock:
+                version = self.local.versions.setdefault(namespace, version)
+        return version
+
+    def get_timeouts(self, keys, version=None):
+        # Local copies must not outlive the Redis entries they were read from.
+        made_keys = [self.make_key(key, version=version) for key in keys]
+        try:
+            pipeline = self.client.get_client(write=False).pipeline(transaction=False)
+            for made_key in made_keys:
+                pipeline.pttl(made_key)
+            ttls = pipeline.execute()
+        except RedisError:
+            return dict.fromkeys(keys, 0)
+        return {
+            key: None if ttl == -1 else max(ttl, 0) / 1000
+            for key, ttl in zip(keys, ttls, strict=True)
+        }
+
+    def invalidate(self, keys, version=None, *, write=False):
+        by_namespace = {}
+        for key in keys:
+            namespace = self.get_namespace(key)
+            if write and namespace in self.write_once_namespaces:
+                continue
+            if namespace is not None:
+                by_namespace.setdefault(namespace, []).append(
+                    self.make_key(key, version=version),
+                )
+        for namespace, local_keys in by_namespace.items():
+            namespace_version = super().incr(
+                self.get_version_key(namespace),
+                ignore_key_check=True,
+            )
+            self.local.bump(namespace, namespace_version, local_keys)
+
+    def get(self, key, default=None, version=None, client=None):
+        namespace = self.get_namespace(key)
+        if namespace is None:
+            value = super().get(key, MISSING, version, client)
+            self.local.record("redis", hit=value is not MISSING)
+            return default if value is MISSING else value
+        self.refresh_versions()
+        local_key = self.make_key(key, version=version)
+        value = self.local.get(local_key)
+        if value is not MISSING:
+            return value
+        # The version is read before the value, so a concurrent write can only
+        # make the local copy look older than it is, never newer.
+        namespace_version = self.get_namespace_version(namespace)
+        value = super().get(key, MISSING, version, client)
+        self.local.record("redis", hit=value is not MISSING)
+        if value is MISSING:
+            return default
+        timeout = self.get_timeouts([key], version)[key]
+        self.local.set(local_key, value, namespace, namespace_version, timeout)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        self.refresh_versions()
+        found = {}
+        remote_keys = []
+        for key in keys:
+            if self.get_namespace(key) is not None:
+                value = self.local.get(self.make_key(key, version=version))
+                if value is not MISSING:
+                    found[key] = value
+                    continue
+            remote_keys.append(key)
+        if not remote_keys:
+            return found
+        namespace_versions = {
+            namespace: self.get_namespace_version(namespace)
+            for namespace in {self.get_namespace(key) for key in remote_keys}
+            if namespace is not None
+        }
+        values = super().get_many(remote_keys, version=version, client=client)
+        local_keys = [
+            key
+            for key in remote_keys
+            if key in values and self.get_namespace(key) is not None
+        ]
+        timeouts = self.get_timeouts(local_keys, version) if local_keys else {}
+        for key in remote_keys:
+            self.local.record("redis", hit=key in values)
+        for key in local_keys:
+            namespace = self.get_namespace(key)
+            self.local.set(
+                self.make_key(key, version=version),
+                values[key],
+                namespace,
+                namespace_versions[namespace],
+                timeouts[key],
+            )
+        found.update(values)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, **kwargs):
+        result = super().set(key, value, timeout, version, **kwargs)
+        self.invalidate([key], version, write=True)
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        added = super().add(key, value, timeout, version, client)
+        if added:
+            self.invalidate([key], version, write=True)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().set_many(data, timeout, version=version, client=client)
+        self.invalidate(data, version, write=True)
+        return result
+
+    def delete(self, key, version=None, **kwargs):
+        result = super().delete(key, version=version, **kwargs)
+        self.invalidate([key], version)
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self.invalidate(keys, version)
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self.invalidate(f"{namespace}:" for namespace in list(self.local.versions))
+        return result
+
+    def incr(self, key, delta=1, version=None, **kwargs):
+        result = super().incr(key, delta, version, **kwargs)
+        self.invalidate([key], version)
+        return result
+
+    def decr(self, key, delta=1, version=None, **kwargs):
+        result = super().decr(key, delta, version, **kwargs)
+        self.invalidate([key], version)
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self.local.clear()
+        # The version keys went with the rest of the database; bumping them
+        # again tells the other processes to drop their copies.
+        self.invalidate(f"{namespace}:" for namespace in list(self.local.versions))
+        return result
+
+    def has_key(self, key, version=None, client=None):
+        if self.get_namespace(key) is not None:
+            self.refresh_versions()
+            if self.local.get(self.make_key(key, version=version)) is not MISSING:
+                return True
+        return super().has_key(key, version=version, client=client)
+
+    def get_stats(self):
+        with self.local.lock:
+            stats = {tier: dict(counts) for tier, counts in self.local.stats.items()}
+            stats["local"]["entries"] = len(self.local.entries)
+        return stats
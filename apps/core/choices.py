@@ -36,3 +36,9 @@ class Gender(models.TextChoices):
     MALE = "MALE", _("Masculino")
     FEMALE = "FEMALE", _("Feminino")
     OTHER = "OTHER", _("Outro")
+
+
+class JobStatus(models.TextChoices):
+    PENDING = "PENDING", _("Pendente")
+    RUNNING = "RUNNING", _("Em execução")
+    FAILED = "FAILED", _("Falhou")
@@ -0,0 +1,106 @@
+import functools
+import math
+import random
+import time
+import uuid
+
+from django.core.cache import cache
+
+KEY_PREFIX = "computation"
+LOCK_KEY_PREFIX = "computation-lock"
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+
+
+def get_computation_key(key, args=(), kwargs=None):
+    parts = [
+        KEY_PREFIX,
+        key,
+        *(str(arg) for arg in args),
+        *(f"{name}={value}" for name, value in sorted((kwargs or {}).items())),
+    ]
+    return ":".join(parts)
+
+
+def is_fresh(entry, beta):
+    # Probabilistic early expiration (XFetch): the closer the entry is to
+    # expiring and the longer it took to compute, the likelier a reader is to
+    # refresh it before it expires.
+    gap = -entry["delta"] * beta * math.log(1 - random.random())  # noqa: S311
+    return time.time() + gap < entry["expires_at"]
+
+
+def acquire_lock(key):
+    token = uuid.uuid4().hex
+    if cache.add(f"{LOCK_KEY_PREFIX}:{key}", token, LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_lock(key, token):
+    lock_key = f"{LOCK_KEY_PREFIX}:{key}"
+    # A computation that outlived its lock must not release the next holder's.
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def refresh(key, compute, timeout, stale_timeout, token):
+    try:
+        started_at = time.monotonic()
+        value = compute()
+        entry = {
+            "value": value,
+            "delta": time.monotonic() - started_at,
+            "expires_at": time.time() + timeout,
+        }
+        cache.set(key, entry, timeout + stale_timeout)
+    finally:
+        release_lock(key, token)
+    return value
+
+
+def get_or_compute(key, compute, timeout, *, stale_timeout=None, beta=1.0):
+    # Entries stay in the cache for stale_timeout seconds past their timeout,
+    # so readers keep getting the previous value while one worker recomputes.
+    if stale_timeout is None:
+        stale_timeout = timeout
+    entry = cache.get(key)
+    if entry is not None and is_fresh(entry, beta):
+        return entry["value"]
+    token = acquire_lock(key)
+    if token:
+        return refresh(key, compute, timeout, stale_timeout, token)
+    if entry is not None:
+        return entry["value"]
+    # Nothing to serve yet: wait for the worker holding the lock, and take
+    # over if it goes away without storing a value.
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+        token = acquire_lock(key)
+        if token:
+            return refresh(key, compute, timeout, stale_timeout, token)
+    return compute()
+
+
+def cached_computation(key, timeout, **options):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                get_computation_key(key, args, kwargs),
+                lambda: func(*args, **kwargs),
+                timeout,
+                **options,
+            )
+
+        def invalidate(*args, **kwargs):
+            cache.delete(get_computation_key(key, args, kwargs))
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
@@ -0,0 +1,7 @@
+from .pagecache import CSRF_TOKEN_PLACEHOLDER
+
+
+def page_cache(request):
+    if getattr(request, "page_cache_key", None):
+        return {"csrf_token": CSRF_TOKEN_PLACEHOLDER}
+    return {}
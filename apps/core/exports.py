@@ -0,0 +1,76 @@
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(header, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row, strict=True))) + "\n"
+
+
+def iter_buffered(chunks, buffer_size=BUFFER_SIZE):
+    # The first chunk is sent on its own so the response starts immediately;
+    # the rest is grouped to keep writes large.
+    chunks = iter(chunks)
+    yield next(chunks, "").encode()
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for index, chunk in enumerate(chunks):
+        data = compressor.compress(chunk)
+        if index == 0:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8"),
+}
+
+
+def get_export_response(header, rows, *, filename, export_format="csv", compress=False):
+    if export_format not in EXPORT_FORMATS:
+        msg = f"Unsupported export format '{export_format}'"
+        raise ValueError(msg)
+    iter_format, content_type = EXPORT_FORMATS[export_format]
+    content = iter_buffered(iter_format(header, rows))
+    filename = f"{filename}.{export_format}"
+    if compress:
+        content = iter_gzip(content)
+        content_type = "application/gzip"
+        filename = f"{filename}.gz"
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,73 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.utils import timezone
+
+from .choices import JobStatus
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 30
+# Jobs left running by a worker that died are handed out again after this.
+RUNNING_TIMEOUT = 10 * 60
+
+TASKS = {}
+
+
+def task(name):
+    def register(func):
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def enqueue(name, **payload):
+    return Job.objects.create(task=name, payload=payload)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.filter(
+                Q(status=JobStatus.PENDING, run_after__lte=now)
+                | Q(
+                    status=JobStatus.RUNNING,
+                    modified__lt=now - timedelta(seconds=RUNNING_TIMEOUT),
+                ),
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("run_after")[:limit],
+        )
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=JobStatus.RUNNING,
+            attempts=F("attempts") + 1,
+            modified=now,
+        )
+    return jobs
+
+
+def run_job(job):
+    try:
+        func = TASKS[job.task]
+        func(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        attempts = job.attempts + 1
+        failed = attempts >= MAX_ATTEMPTS
+        Job.objects.filter(pk=job.pk).update(
+            status=JobStatus.FAILED if failed else JobStatus.PENDING,
+            run_after=timezone.now() + timedelta(seconds=RETRY_DELAY * attempts),
+            last_error=traceback.format_exc(),
+            modified=timezone.now(),
+        )
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+from apps.core.jobs import claim_jobs
+from apps.core.jobs import run_job
+
+
+def run_job_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Executa as tarefas em segundo plano enfileiradas no banco de dados."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Quantidade de tarefas executadas em paralelo.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Segundos de espera quando não há tarefas pendentes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Executa as tarefas pendentes e encerra.",
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules("tasks")
+        workers = options["workers"]
+        processed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                jobs = claim_jobs(workers - len(running))
+                running.update(executor.submit(run_job_in_thread, job) for job in jobs)
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                processed += len(done)
+        self.stdout.write(self.style.SUCCESS(f"{processed} tarefas executadas."))
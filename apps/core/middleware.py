@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+
+from .pagecache import CSRF_TOKEN_PLACEHOLDER
+from .pagecache import SURROGATE_KEY_HEADER
+from .pagecache import cache_page
+from .pagecache import get_cached_page
+from .pagecache import get_page_cache_key
+
+
+class UploadLimitMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != "POST" or request.content_type != "multipart/form-data":
+            return None
+        # Parsing the body runs the upload handlers before the CSRF check or
+        # the view touches a partially read request.
+        request.POST  # noqa: B018
+        errors = getattr(request, "upload_errors", None)
+        if errors:
+            return render(
+                request,
+                "413.html",
+                {"errors": errors},
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+        return None
+
+
+class PageCacheMiddleware:
+    def __init__(self, get_response):
+        if not settings.PAGE_CACHE_TIMEOUT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.is_cacheable_request(request):
+            request.page_cache_key = get_page_cache_key(request)
+        if not getattr(request, "page_cache_key", None):
+            return self.get_response(request)
+        response = get_cached_page(request.page_cache_key)
+        if response is None:
+            response = self.get_response(request)
+            if self.is_cacheable_response(request, response):
+                cache_page(request.page_cache_key, response)
+        return self.insert_csrf_token(request, response)
+
+    def is_cacheable_request(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.htmx
+            and CookieStorage.cookie_name not in request.COOKIES
+            and not request.user.is_authenticated
+        )
+
+    def is_cacheable_response(self, request, response):
+        # Only views that tag their pages with surrogate keys are cached, so
+        # every entry can be purged.
+        return (
+            request.method == "GET"
+            and response.status_code == HTTPStatus.OK
+            and not response.streaming
+            and not response.cookies
+            and response.has_header(SURROGATE_KEY_HEADER)
+        )
+
+    def insert_csrf_token(self, request, response):
+        # Cached pages are rendered with a placeholder instead of the
+        # visitor's CSRF token, which is filled in on the way out.
+        placeholder = CSRF_TOKEN_PLACEHOLDER.encode()
+        if not response.streaming and placeholder in response.content:
+            response.content = response.content.replace(
+                placeholder,
+                get_token(request).encode(),
+            )
+        return response
@@ -0,0 +1,58 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from model_utils.models import TimeStampedModel
+
+from .choices import JobStatus
+
+
+class Job(TimeStampedModel):
+    id = models.UUIDField(
+        verbose_name=_("ID"),
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+    )
+    task = models.CharField(
+        verbose_name=_("Tarefa"),
+        max_length=200,
+    )
+    payload = models.JSONField(
+        verbose_name=_("Parâmetros"),
+        default=dict,
+        blank=True,
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name=_("Tentativas"),
+        default=0,
+    )
+    run_after = models.DateTimeField(
+        verbose_name=_("Executar após"),
+        default=timezone.now,
+    )
+    last_error = models.TextField(
+        verbose_name=_("Último erro"),
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = _("Tarefa em segundo plano")
+        verbose_name_plural = _("Tarefas em segundo plano")
+        ordering = ["run_after"]
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"],
+                name="job_status_run_after_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.get_status_display()})"
@@ -0,0 +1,87 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+CSRF_TOKEN_PLACEHOLDER = "__page_cache_csrf_token__"  # noqa: S105
+PAGE_KEY_PREFIX = "pagecache:page"
+VERSION_KEY_PREFIX = "surrogate"
+CACHED_HEADERS = (SURROGATE_KEY_HEADER, "Content-Language", "Vary")
+
+
+def get_surrogate_key(model, pk):
+    return f"{model._meta.model_name}:{pk}"  # noqa: SLF001
+
+
+def get_version_key(surrogate_key):
+    return f"{VERSION_KEY_PREFIX}:{surrogate_key}"
+
+
+def get_surrogate_key_versions(surrogate_keys):
+    version_keys = {get_version_key(key): key for key in surrogate_keys}
+    versions = cache.get_many(version_keys)
+    return {
+        key: versions.get(version_key, 0) for version_key, key in version_keys.items()
+    }
+
+
+def purge_surrogate_keys(*surrogate_keys):
+    for surrogate_key in surrogate_keys:
+        version_key = get_version_key(surrogate_key)
+        cache.add(version_key, 0, None)
+        cache.incr(version_key)
+
+
+def get_page_cache_key(request):
+    # Tracking parameters are dropped and the rest sorted, so the same page
+    # is stored once. Unknown parameters would let anyone fill the cache with
+    # copies of a page, so those requests are not cached at all.
+    params = []
+    for name, values in request.GET.lists():
+        if name in settings.PAGE_CACHE_IGNORED_QUERY_PARAMS:
+            continue
+        if name not in settings.PAGE_CACHE_QUERY_PARAMS:
+            return None
+        params.extend((name, value) for value in values)
+    url = request.build_absolute_uri(request.path)
+    if params:
+        url = f"{url}?{urlencode(sorted(params))}"
+    url = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"{PAGE_KEY_PREFIX}:{request.LANGUAGE_CODE}:{url}"
+
+
+def get_cached_page(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    # A purge bumps the version of one of the page's surrogate keys, which
+    # makes every page tagged with it stale at once.
+    if get_surrogate_key_versions(entry["versions"]) != entry["versions"]:
+        return None
+    response = HttpResponse(
+        entry["content"],
+        content_type=entry["content_type"],
+        status=entry["status"],
+    )
+    for header, value in entry["headers"].items():
+        response[header] = value
+    return response
+
+
+def cache_page(key, response):
+    surrogate_keys = response[SURROGATE_KEY_HEADER].split()
+    entry = {
+        "content": response.content,
+        "content_type": response["Content-Type"],
+        "status": response.status_code,
+        "headers": {
+            header: response[header]
+            for header in CACHED_HEADERS
+            if response.has_header(header)
+        },
+        "versions": get_surrogate_key_versions(surrogate_keys),
+    }
+    cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
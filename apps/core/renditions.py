@@ -0,0 +1,118 @@
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image
+from PIL import ImageOps
+
+RENDITION_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def get_rendition_name(name, rendition, image_format):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    extension = RENDITION_FORMATS[image_format][1]
+    return posixpath.join(directory, "renditions", f"{stem}_{rendition}.{extension}")
+
+
+def open_image(field_file):
+    with field_file.open("rb") as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def generate_renditions(field_file, sizes):
+    storage = field_file.storage
+    image = open_image(field_file)
+    data = {"source": field_file.name}
+    # Largest first, so every rendition is resized from the previous one.
+    for rendition in sorted(sizes, key=sizes.get, reverse=True):
+        image.thumbnail(sizes[rendition], Image.Resampling.LANCZOS, reducing_gap=3.0)
+        entry = {"width": image.width, "height": image.height}
+        for image_format, (pil_format, _, options) in RENDITION_FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **options)
+            entry[image_format] = storage.save(
+                get_rendition_name(field_file.name, rendition, image_format),
+                ContentFile(buffer.getvalue()),
+            )
+        data[rendition] = entry
+    return data
+
+
+def delete_renditions(storage, data):
+    for entry in data.values():
+        if not isinstance(entry, dict):
+            continue
+        for image_format in RENDITION_FORMATS:
+            if entry.get(image_format):
+                storage.delete(entry[image_format])
+
+
+class Rendition:
+    def __init__(self, name, storage, data, fallback_url):
+        self.name = name
+        self.storage = storage
+        self.data = data or {}
+        self.fallback_url = fallback_url
+
+    def __bool__(self):
+        return bool(self.data)
+
+    @property
+    def width(self):
+        return self.data.get("width")
+
+    @property
+    def height(self):
+        return self.data.get("height")
+
+    def get_url(self, image_format="jpeg"):
+        name = self.data.get(image_format)
+        return self.storage.url(name) if name else self.fallback_url
+
+    @property
+    def url(self):
+        return self.get_url("jpeg")
+
+    @property
+    def webp_url(self):
+        return self.get_url("webp")
+
+
+class Renditions:
+    def __init__(self, storage, data, sizes, fallback_url):
+        self.storage = storage
+        self.data = data or {}
+        self.sizes = sizes
+        self.fallback_url = fallback_url
+
+    def __bool__(self):
+        return any(name in self.data for name in self.sizes)
+
+    def __getitem__(self, name):
+        if name not in self.sizes:
+            raise KeyError(name)
+        return Rendition(name, self.storage, self.data.get(name), self.fallback_url)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+    def __iter__(self):
+        for name in sorted(self.sizes, key=self.sizes.get):
+            rendition = self[name]
+            if rendition:
+                yield rendition
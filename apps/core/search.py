@@ -0,0 +1,174 @@
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db import router
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+
+class SearchBackend:
+    def __init__(self, model, search_fields):
+        self.model = model
+        self.search_fields = list(search_fields)
+
+    def get_terms(self, query):
+        return [term for term in query.split() if term]
+
+    def search(self, queryset, query):
+        query_filter = Q()
+        for term in self.get_terms(query):
+            term_query = Q()
+            for field in self.search_fields:
+                term_query |= Q(**{f"{field}__icontains": term})
+            query_filter |= term_query
+        return queryset.filter(query_filter).distinct()
+
+    def update_index(self, queryset):
+        pass
+
+    def remove_from_index(self, pks):
+        pass
+
+
+class FullTextSearchBackend(SearchBackend):
+    def __init__(self, model, search_fields=None):
+        indexed_fields = getattr(model, "SEARCH_FIELDS", ())
+        if not indexed_fields:
+            msg = f"{model.__name__} does not define SEARCH_FIELDS"
+            raise ImproperlyConfigured(msg)
+        super().__init__(model, indexed_fields)
+
+    def get_connection(self, queryset=None):
+        using = queryset.db if queryset is not None else router.db_for_write(self.model)
+        return connections[using]
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    config = "portuguese_unaccent"
+    vector_field = "search_vector"
+
+    def get_vector(self):
+        # The first indexed field (usually the name) weighs more in the ranking.
+        first, *rest = self.search_fields
+        vector = SearchVector(first, config=self.config, weight="A")
+        for field in rest:
+            vector += SearchVector(field, config=self.config, weight="B")
+        return vector
+
+    def search(self, queryset, query):
+        search_query = SearchQuery(query, config=self.config, search_type="websearch")
+        trigram_field = self.search_fields[0]
+        # Trigram similarity on the first field keeps typos ("camista") matching.
+        # The rank is cast to double precision so it round-trips exactly
+        # through cursors.
+        return (
+            queryset.annotate(
+                search_rank=Cast(
+                    SearchRank(F(self.vector_field), search_query)
+                    + TrigramSimilarity(trigram_field, query),
+                    output_field=FloatField(),
+                ),
+            )
+            .filter(
+                Q(**{self.vector_field: search_query})
+                | TrigramSimilar(F(trigram_field), query),
+            )
+            .order_by("-search_rank")
+        )
+
+    def update_index(self, queryset):
+        return queryset.update(**{self.vector_field: self.get_vector()})
+
+
+class SqliteSearchBackend(FullTextSearchBackend):
+    def get_table_name(self):
+        return f"{self.model._meta.db_table}_fts"  # noqa: SLF001
+
+    def get_match_expression(self, query):
+        # Every term is quoted so user input never reaches the FTS5 query
+        # syntax, and matched as a prefix to make up for the lack of stemming.
+        terms = [term.replace('"', '""') for term in self.get_terms(query)]
+        return " OR ".join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        match = self.get_match_expression(query)
+        if not match:
+            return queryset.none()
+        connection = self.get_connection(queryset)
+        opts = self.model._meta  # noqa: SLF001
+        table = connection.ops.quote_name(self.get_table_name())
+        pk_column = (
+            f"{connection.ops.quote_name(opts.db_table)}."
+            f"{connection.ops.quote_name(opts.pk.column)}"
+        )
+        # Identifiers are quoted by the backend and the user query is always
+        # passed as a parameter.
+        matches_sql = f"SELECT object_id FROM {table} WHERE {table} MATCH %s"  # noqa: S608
+        rank_sql = (
+            f"SELECT -bm25({table}) FROM {table} "  # noqa: S608
+            f"WHERE {table} MATCH %s AND object_id = {pk_column}"
+        )
+        return (
+            queryset.filter(pk__in=RawSQL(matches_sql, (match,)))  # noqa: S611
+            .annotate(
+                search_rank=RawSQL(rank_sql, (match,), output_field=FloatField()),  # noqa: S611
+            )
+            .order_by("-search_rank")
+        )
+
+    def update_index(self, queryset):
+        connection = self.get_connection(queryset)
+        table = connection.ops.quote_name(self.get_table_name())
+        columns = ", ".join(
+            connection.ops.quote_name(self.model._meta.get_field(field).column)  # noqa: SLF001
+            for field in self.search_fields
+        )
+        rows = queryset.order_by().values("pk", *self.search_fields)
+        sql, params = rows.query.sql_with_params()
+        pks_sql, pks_params = queryset.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE object_id IN ({pks_sql})",  # noqa: S608
+                pks_params,
+            )
+            cursor.execute(
+                f"INSERT INTO {table} (object_id, {columns}) {sql}",
+                params,
+            )
+
+    def remove_from_index(self, pks):
+        connection = self.get_connection()
+        table = connection.ops.quote_name(self.get_table_name())
+        pk_field = self.model._meta.pk  # noqa: SLF001
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE object_id = %s",  # noqa: S608
+                [(pk_field.get_db_prep_value(pk, connection),) for pk in pks],
+            )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def get_search_backend(model, search_fields=None):
+    indexed_fields = getattr(model, "SEARCH_FIELDS", ())
+    if search_fields is None:
+        search_fields = indexed_fields
+    vendor = connections[router.db_for_read(model)].vendor
+    if (
+        indexed_fields
+        and set(search_fields) <= set(indexed_fields)
+        and vendor in SEARCH_BACKENDS
+    ):
+        return SEARCH_BACKENDS[vendor](model, search_fields)
+    return SearchBackend(model, search_fields)
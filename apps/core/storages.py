@@ -0,0 +1,93 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.core.files.utils import validate_file_name
+from django.utils.module_loading import import_string
+
+DIGEST_LENGTH = 40
+
+DIGEST_NAME_RE = re.compile(rf"^[0-9a-f]{{{DIGEST_LENGTH}}}(\.\w+)?$")
+
+
+def get_content_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()[:DIGEST_LENGTH]
+
+
+class ContentAddressedStorage(Storage):
+    def __init__(
+        self,
+        backend="django.core.files.storage.FileSystemStorage",
+        options=None,
+    ):
+        self.backend = import_string(backend)(**(options or {}))
+
+    def get_content_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, f"{get_content_digest(content)}{extension}")
+
+    def is_content_addressed(self, name):
+        return bool(DIGEST_NAME_RE.match(posixpath.basename(name)))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+        name = self.get_content_name(name, content)
+        if max_length is not None and len(name) > max_length:
+            msg = f'Storage can not store "{name}" in {max_length} characters.'
+            raise SuspiciousFileOperation(msg)
+        # Identical content always maps to the same name, so a duplicate costs
+        # a single existence check instead of another upload.
+        if self.backend.exists(name):
+            return name
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        return self.backend._save(name, content)  # noqa: SLF001
+
+    def _open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def delete(self, name):
+        # Blobs can be shared by any number of records, so only files stored
+        # before content addressing was enabled are removed.
+        if not self.is_content_addressed(name):
+            self.backend.delete(name)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def generate_filename(self, filename):
+        return self.backend.generate_filename(filename)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
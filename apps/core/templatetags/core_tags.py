@@ -1,4 +1,8 @@
 from django import template
+from django.template import TemplateSyntaxError
+
+from apps.core.computations import get_computation_key
+from apps.core.computations import get_or_compute
 
 register = template.Library()
 
@@ -19,3 +23,61 @@ def active_class(context, *view_names, css_class="active", prefix_match=False):
     else:
         matches = current_view_name in view_names
     return css_class if matches else ""
+
+
+@register.simple_tag
+def rendition_srcset(renditions, image_format="webp"):
+    return ", ".join(
+        f"{rendition.get_url(image_format)} {rendition.width}w"
+        for rendition in renditions
+    )
+
+
+@register.inclusion_tag("partials/rendition_picture.html")
+def rendition_picture(renditions, name, alt="", sizes=None, **attrs):
+    rendition = renditions[name]
+    return {
+        "renditions": renditions,
+        "rendition": rendition,
+        "alt": alt,
+        "sizes": sizes or f"{rendition.width}px",
+        "css_class": attrs.get("class", ""),
+        "loading": attrs.get("loading", "lazy"),
+    }
+
+
+class CachedComputationNode(template.Node):
+    def __init__(self, nodelist, timeout, name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = get_computation_key(
+            f"fragment:{self.name}",
+            [value.resolve(context) for value in self.vary_on],
+        )
+        return get_or_compute(
+            key,
+            lambda: self.nodelist.render(context),
+            self.timeout.resolve(context),
+        )
+
+
+@register.tag
+def cached_computation(parser, token):
+    # {% cached_computation <timeout> <name> [vary_on ...] %} ...
+    # {% endcached_computation %}
+    bits = token.split_contents()
+    if len(bits) < 3:  # noqa: PLR2004
+        msg = f"'{bits[0]}' tag requires at least 2 arguments."
+        raise TemplateSyntaxError(msg)
+    nodelist = parser.parse(("endcached_computation",))
+    parser.delete_first_token()
+    return CachedComputationNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
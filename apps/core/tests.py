@@ -0,0 +1,205 @@
+import io
+import threading
+import time
+import uuid
+from http import HTTPStatus
+
+import fakeredis
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import override_settings
+from django.test.client import BOUNDARY
+from django.test.client import MULTIPART_CONTENT
+from django.test.client import encode_multipart
+
+from .cache import TwoTierCache
+from .computations import get_or_compute
+from .middleware import UploadLimitMiddleware
+from .pagecache import get_page_cache_key
+from .uploadhandlers import LimitedUploadHandler
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+GIF_HEADER = b"GIF89a"
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = super().readline(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class UploadLimitTests(SimpleTestCase):
+    def post(self, field_name, content):
+        body = encode_multipart(
+            BOUNDARY,
+            {field_name: SimpleUploadedFile("upload.bin", content)},
+        )
+        stream = CountingStream(body)
+        request = WSGIRequest(
+            {
+                "REQUEST_METHOD": "POST",
+                "PATH_INFO": "/",
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "CONTENT_TYPE": MULTIPART_CONTENT,
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": stream,
+            },
+        )
+        middleware = UploadLimitMiddleware(lambda request: HttpResponse())
+        response = middleware.process_view(request, None, (), {})
+        return request, response, stream
+
+    def test_oversized_upload_is_aborted_while_streaming(self):
+        max_size = settings.UPLOAD_LIMITS["image"]["max_size"]
+        content = PNG_HEADER + bytes(40 * max_size)
+        for field_name in ("image", "profile-image"):
+            request, response, stream = self.post(field_name, content)
+            assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            assert field_name in request.upload_errors
+            # Reading stops right after the chunk that went over the limit.
+            assert stream.bytes_read < max_size + 2 * LimitedUploadHandler.chunk_size
+
+    def test_wrong_format_is_rejected_on_the_first_chunk(self):
+        content = GIF_HEADER + bytes(settings.UPLOAD_LIMITS["image"]["max_size"])
+        _request, response, stream = self.post("image", content)
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        assert stream.bytes_read < 2 * LimitedUploadHandler.chunk_size
+
+    def test_uploads_within_limits_are_accepted(self):
+        content = PNG_HEADER + bytes(1024 * 1024)
+        request, response, stream = self.post("image", content)
+        assert response is None
+        assert request.FILES["image"].size == len(content)
+        assert stream.bytes_read == int(request.META["CONTENT_LENGTH"])
+
+
+class GetOrComputeTests(SimpleTestCase):
+    workers = 50
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def compute(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        # Slow enough for every other thread to miss while it runs.
+        time.sleep(0.2)
+        return f"valor {calls}"
+
+    def read_concurrently(self):
+        barrier = threading.Barrier(self.workers)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(get_or_compute("stampede", self.compute, 60))
+
+        threads = [threading.Thread(target=read) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_misses_compute_once(self):
+        results = self.read_concurrently()
+        assert self.calls == 1
+        assert results == ["valor 1"] * self.workers
+
+    def test_stale_value_is_served_while_one_reader_refreshes(self):
+        get_or_compute("stampede", self.compute, 60)
+        entry = cache.get("stampede")
+        cache.set("stampede", {**entry, "expires_at": time.time() - 1}, 60)
+        results = self.read_concurrently()
+        assert self.calls == 2  # noqa: PLR2004
+        assert results.count("valor 2") == 1
+        assert cache.get("stampede")["value"] == "valor 2"
+
+
+class PageCacheKeyTests(SimpleTestCase):
+    def get_key(self, url):
+        request = RequestFactory().get(url)
+        request.LANGUAGE_CODE = "pt-br"
+        return get_page_cache_key(request)
+
+    def test_tracking_parameters_are_ignored(self):
+        assert self.get_key("/?utm_source=news&fbclid=abc") == self.get_key("/")
+
+    def test_unknown_parameters_skip_the_cache(self):
+        assert self.get_key("/?x=1") is None
+
+    @override_settings(PAGE_CACHE_QUERY_PARAMS=["page", "sort"])
+    def test_known_parameters_are_normalized(self):
+        key = self.get_key("/?page=2&sort=price")
+        assert key == self.get_key("/?sort=price&utm_medium=email&page=2")
+        assert key != self.get_key("/?page=3&sort=price")
+        assert self.get_key("/?page=2&sort=price&x=1") is None
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    local_timeout = 60
+
+    def setUp(self):
+        self.cache = TwoTierCache(
+            "redis://127.0.0.1:6379/0",
+            {
+                "KEY_PREFIX": uuid.uuid4().hex,
+                "OPTIONS": {
+                    "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                    "LOCAL_TIMEOUT": self.local_timeout,
+                    "WRITE_ONCE_NAMESPACES": ["cards"],
+                },
+            },
+        )
+        self.cache.client._clients[0] = fakeredis.FakeRedis()  # noqa: SLF001
+
+    def get_local_timeout(self, key):
+        expires_at = self.cache.local.entries[self.cache.make_key(key)][1]
+        return expires_at - time.monotonic()
+
+    def test_local_copies_expire_with_the_redis_entry(self):
+        self.cache.set("products:short", 1, 5)
+        self.cache.set("products:long", 2, None)
+        self.cache.set("products:many", 3, 5)
+        self.cache.get("products:short")
+        self.cache.get("products:long")
+        self.cache.get_many(["products:many"])
+        assert self.get_local_timeout("products:short") <= 5  # noqa: PLR2004
+        assert self.get_local_timeout("products:many") <= 5  # noqa: PLR2004
+        assert self.get_local_timeout("products:long") > 5  # noqa: PLR2004
+        assert self.get_local_timeout("products:long") <= self.local_timeout
+
+    def test_write_once_keys_do_not_bump_their_namespace(self):
+        self.cache.set("products:count", 1)
+        self.cache.get("products:count")
+        versions = {
+            namespace: self.cache.get(self.cache.get_version_key(namespace))
+            for namespace in ("products", "cards")
+        }
+        self.cache.set_many({"cards:1": "<div>", "cards:2": "<div>"})
+        self.cache.set("cards:3", "<div>")
+        for namespace, version in versions.items():
+            assert self.cache.get(self.cache.get_version_key(namespace)) == version
+        # Other entries keep being served locally.
+        assert self.cache.make_key("products:count") in self.cache.local.entries
+        self.cache.delete("cards:1")
+        assert self.cache.get(self.cache.get_version_key("cards")) == 1
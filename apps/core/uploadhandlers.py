@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from django.core.files.uploadhandler import StopUpload
+from django.template.defaultfilters import filesizeformat
+from django.utils.translation import gettext as _
+
+SNIFF_SIZE = 12
+
+CONTENT_TYPE_SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+}
+
+
+def sniff_content_type(header):
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for content_type, signatures in CONTENT_TYPE_SIGNATURES.items():
+        if header.startswith(signatures):
+            return content_type
+    return None
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    # Limits are enforced while the body streams in, so an oversized upload is
+    # aborted without reading the rest of it. FileSizeValidator still guards
+    # the model fields.
+    chunk_size = 64 * 1024
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.limits = self.get_limits(field_name)
+        self.received = 0
+        self.header = b""
+        self.sniffed = False
+
+    def get_limits(self, field_name):
+        # Form prefixes ("profile-image") share the limits of the bare field.
+        name = field_name.rsplit("-", 1)[-1]
+        limits = settings.UPLOAD_LIMITS.get(name, {})
+        return {
+            "max_size": limits.get("max_size", settings.UPLOAD_DEFAULT_MAX_SIZE),
+            "content_types": limits.get("content_types"),
+        }
+
+    def reject(self, message):
+        errors = getattr(self.request, "upload_errors", {})
+        errors[self.field_name] = message
+        self.request.upload_errors = errors
+        raise StopUpload(connection_reset=True)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        max_size = self.limits["max_size"]
+        if self.received > max_size:
+            self.reject(
+                _("O tamanho do arquivo não pode ser maior que %(max_size)s.")
+                % {"max_size": filesizeformat(max_size)},
+            )
+        if not self.sniffed:
+            self.header += raw_data[: SNIFF_SIZE - len(self.header)]
+            if len(self.header) >= SNIFF_SIZE:
+                self.check_content_type()
+        return raw_data
+
+    def check_content_type(self):
+        self.sniffed = True
+        allowed = self.limits["content_types"]
+        if allowed and sniff_content_type(self.header) not in allowed:
+            self.reject(_("O formato do arquivo não é permitido."))
+
+    def file_complete(self, file_size):
+        if not self.sniffed:
+            # Files shorter than the signature window are checked at the end.
+            self.check_content_type()
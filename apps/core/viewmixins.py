@@ -1,11 +1,27 @@
+import base64
+import binascii
+import hashlib
+import json
 from collections.abc import Iterable
+from datetime import datetime
+from functools import cmp_to_key
+from http import HTTPStatus
 
 from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError
 from django.db.models import Q
 from django.http import Http404
 from django.http import HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language
 from django_htmx.http import HttpResponseClientRedirect
 
+from .pagecache import SURROGATE_KEY_HEADER
+from .search import get_search_backend
+
 TemplateSpec = str | Iterable[str]
 
 
@@ -20,14 +36,8 @@ class SearchMixin:
         query = self.get_search_query()
         if not query or not self.search_fields:
             return queryset
-        terms = [term for term in query.split() if term]
-        query_filter = Q()
-        for term in terms:
-            term_query = Q()
-            for field in self.search_fields:
-                term_query |= Q(**{f"{field}__icontains": term})
-            query_filter |= term_query
-        return queryset.filter(query_filter).distinct()
+        backend = get_search_backend(queryset.model, self.search_fields)
+        return backend.search(queryset, query)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -38,10 +48,174 @@ class SearchMixin:
         context[self.search_param] = self.get_search_query()
         query_string = self.request.GET.copy()
         query_string.pop("page", None)
+        query_string.pop(getattr(self, "cursor_param", "cursor"), None)
         context["query_string"] = query_string.urlencode()
         return context
 
 
+class CursorPage:
+    def __init__(
+        self,
+        object_list,
+        *,
+        query_dict,
+        cursor_param,
+        next_cursor=None,
+        previous_cursor=None,
+    ):
+        self.object_list = object_list
+        self.query_dict = query_dict
+        self.cursor_param = cursor_param
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _get_query_string(self, cursor):
+        query_dict = self.query_dict.copy()
+        query_dict.pop("page", None)
+        query_dict[self.cursor_param] = cursor
+        return query_dict.urlencode()
+
+    @property
+    def next_query_string(self):
+        return self._get_query_string(self.next_cursor) if self.has_next() else ""
+
+    @property
+    def previous_query_string(self):
+        if not self.has_previous():
+            return ""
+        return self._get_query_string(self.previous_cursor)
+
+
+class CursorPaginationMixin:
+    cursor_param = "cursor"
+    cursor_ordering = ("-created", "-id")
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def _parse_ordering(self, ordering):
+        return [
+            (name[1:], True) if name.startswith("-") else (name, False)
+            for name in ordering
+        ]
+
+    def _get_cursor_field(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        opts = queryset.model._meta  # noqa: SLF001
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def encode_cursor(self, values, *, reverse=False):
+        payload = json.dumps({"p": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        padding = "=" * (-len(cursor) % 4)
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return list(payload["p"]), bool(payload["r"])
+        except (binascii.Error, ValueError, KeyError, TypeError) as e:
+            msg = f"Invalid cursor '{cursor}'"
+            raise Http404(msg) from e
+
+    def get_cursor_values(self, obj, fields):
+        return [str(getattr(obj, name)) for name, _ in fields]
+
+    def get_cursor_filter(self, queryset, fields, values):
+        if len(values) != len(fields):
+            msg = "Cursor does not match the current ordering"
+            raise Http404(msg)
+        try:
+            values = [
+                self._get_cursor_field(queryset, name).to_python(value)
+                for (name, _), value in zip(fields, values, strict=True)
+            ]
+        except ValidationError as e:
+            msg = "Invalid cursor value"
+            raise Http404(msg) from e
+        names = [name for name, _ in fields]
+        cursor_filter = Q()
+        for index, (name, descending) in enumerate(fields):
+            lookup = "lt" if descending else "gt"
+            position = Q(**{f"{name}__{lookup}": values[index]})
+            position &= Q(**dict(zip(names[:index], values[:index], strict=True)))
+            cursor_filter |= position
+        return cursor_filter
+
+    def get_cursor_querysets(self, queryset):
+        return [queryset]
+
+    def _compare_cursor_values(self, fields, a, b):
+        for name, descending in fields:
+            value_a, value_b = getattr(a, name), getattr(b, name)
+            if value_a != value_b:
+                result = -1 if value_a < value_b else 1
+                return -result if descending else result
+        return 0
+
+    def paginate_queryset(self, queryset, page_size):
+        fields = self._parse_ordering(self.get_cursor_ordering())
+        cursor = self.request.GET.get(self.cursor_param)
+        values, reverse = self.decode_cursor(cursor) if cursor else (None, False)
+        query_fields = [(name, descending != reverse) for name, descending in fields]
+        ordering = [
+            f"-{name}" if descending else name for name, descending in query_fields
+        ]
+        querysets = self.get_cursor_querysets(queryset)
+        object_list = []
+        for source in querysets:
+            ordered = source.order_by(*ordering)
+            if values is not None:
+                ordered = ordered.filter(
+                    self.get_cursor_filter(ordered, query_fields, values),
+                )
+            object_list.extend(ordered[: page_size + 1])
+        if len(querysets) > 1:
+            object_list.sort(
+                key=cmp_to_key(
+                    lambda a, b: self._compare_cursor_values(query_fields, a, b),
+                ),
+            )
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+        if reverse:
+            object_list.reverse()
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_more if not reverse else values is not None:
+                next_cursor = self.encode_cursor(
+                    self.get_cursor_values(object_list[-1], fields),
+                )
+            if has_more if reverse else values is not None:
+                previous_cursor = self.encode_cursor(
+                    self.get_cursor_values(object_list[0], fields),
+                    reverse=True,
+                )
+        page = CursorPage(
+            object_list,
+            query_dict=self.request.GET,
+            cursor_param=self.cursor_param,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+        return (None, page, object_list, page.has_other_pages())
+
+
 class HtmxTemplateMixin:
     htmx_template_name: TemplateSpec | None = None
     htmx_param: str | None = None
@@ -177,3 +351,58 @@ class HtmxRedirectMixin:
         if self.request.htmx and isinstance(response, HttpResponseRedirect):
             return HttpResponseClientRedirect(response.url)
         return response
+
+
+class SurrogateKeyMixin:
+    surrogate_keys: Iterable[str] = ()
+
+    def get_surrogate_keys(self) -> list[str]:
+        return list(self.surrogate_keys)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != HTTPStatus.OK:
+            return response
+        surrogate_keys = self.get_surrogate_keys()
+        if surrogate_keys:
+            response[SURROGATE_KEY_HEADER] = " ".join(surrogate_keys)
+        return response
+
+
+class ConditionalGetMixin:
+    def get_validators(self) -> tuple[datetime | None, Iterable]:
+        return None, ()
+
+    def get_etag(self, last_modified: datetime | None, data: Iterable) -> str:
+        request = self.request
+        parts = [
+            last_modified.isoformat() if last_modified else "",
+            *(str(value) for value in data),
+            str(request.user.pk or ""),
+            get_language(),
+            request.headers.get("HX-Request", ""),
+            # Pages embed the CSRF token, which changes with the cookie.
+            request.META.get("CSRF_COOKIE", ""),
+        ]
+        digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+        return f'W/"{digest}"'
+
+    def get(self, request, *args, **kwargs):
+        last_modified, data = self.get_validators()
+        etag = self.get_etag(last_modified, data)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp,
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if timestamp and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(timestamp)
+        response.headers.setdefault("ETag", etag)
+        # Browsers must revalidate instead of guessing a freshness lifetime
+        # from Last-Modified.
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ("HX-Request",))
+        return response
@@ -1,12 +1,39 @@
 from django.views.generic import TemplateView
 
+from apps.core.pagecache import get_surrogate_key
+from apps.core.viewmixins import ConditionalGetMixin
+from apps.core.viewmixins import SurrogateKeyMixin
 from apps.products.models import Product
+from apps.products.services import get_featured_product_ids
 
 
-class HomeView(TemplateView):
+class HomeView(SurrogateKeyMixin, ConditionalGetMixin, TemplateView):
     template_name = "home/index.html"
+    surrogate_keys = ["home", "products"]
+    featured_products = None
+
+    def get_featured_products(self):
+        if self.featured_products is None:
+            ids = get_featured_product_ids()
+            products = Product.objects.in_bulk(ids)
+            self.featured_products = [products[pk] for pk in ids if pk in products]
+        return self.featured_products
+
+    def get_validators(self):
+        products = self.get_featured_products()
+        last_modified = max((product.modified for product in products), default=None)
+        return last_modified, [product.pk for product in products]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["featured_products"] = Product.objects.order_by("-created")[:8]
+        context["featured_products"] = self.get_featured_products()
         return context
+
+    def get_surrogate_keys(self):
+        return [
+            *super().get_surrogate_keys(),
+            *(
+                get_surrogate_key(Product, product.pk)
+                for product in self.featured_products
+            ),
+        ]
@@ -1,7 +1,20 @@
 from django.contrib import admin
+from django.contrib import messages
+from django.contrib.admin.utils import quote
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.shortcuts import redirect
+from django.urls import reverse
 from django.utils import formats
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.adminmixins import ExportMixin
+
+from .choices import OrderStatus
+from .models import ArchivedOrder
+from .models import ArchivedOrderItem
+from .models import DailySalesRollup
 from .models import Order
 from .models import OrderItem
 
@@ -16,23 +29,25 @@ class OrderItemInline(admin.TabularInline):
     fields = (
         "product",
         "quantity",
+        "unit_price",
+        "inline_subtotal",
+    )
+    readonly_fields = (
+        "unit_price",
         "inline_subtotal",
     )
-    readonly_fields = ("inline_subtotal",)
 
     def inline_subtotal(self, obj):
         if not obj.pk:
             return "-"
-        total = 0.00
-        if obj.product:
-            total = obj.product.price * obj.quantity
-        return f"R$ {formats.number_format(total, 2)}"
+        return f"R$ {formats.number_format(obj.subtotal_amount, 2)}"
 
     inline_subtotal.short_description = _("Subtotal")
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ExportMixin, admin.ModelAdmin):
+    change_list_template = "admin/orders/order/change_list.html"
     fieldsets = (
         (
             _("Informações do pedido"),
@@ -57,7 +72,7 @@ class OrderAdmin(admin.ModelAdmin):
             {
                 "fields": (
                     "total_amount",
-                    "number_of_items",
+                    "item_count",
                 ),
             },
         ),
@@ -67,9 +82,10 @@ class OrderAdmin(admin.ModelAdmin):
         "user",
         "status",
         "created",
-        "total_amount",
-        "number_of_items",
+        "total_amount_display",
+        "item_count",
     )
+    list_select_related = ["user"]
     list_filter = [
         "status",
     ]
@@ -85,9 +101,229 @@ class OrderAdmin(admin.ModelAdmin):
         "created",
         "modified",
         "total_amount",
-        "number_of_items",
+        "item_count",
     ]
     inlines = (OrderItemInline,)
+    actions = [
+        "mark_as_paid",
+        "mark_as_cancelled",
+    ]
+    export_fields = [
+        ("order_id", _("Pedido")),
+        ("order__created", _("Data")),
+        ("order__status", _("Status")),
+        ("order__user__email", _("E-mail")),
+        ("order__total_amount", _("Valor total")),
+        ("product_id", _("Produto")),
+        ("product_name", _("Nome do produto")),
+        ("quantity", _("Quantidade")),
+        ("unit_price", _("Preço unitário")),
+    ]
+    export_filename = "pedidos"
+
+    def get_readonly_fields(self, request, obj=None):
+        readonly_fields = super().get_readonly_fields(request, obj)
+        if obj is not None:
+            return [*readonly_fields, "status"]
+        return readonly_fields
+
+    def get_archived_orders_url(self, request):
+        # The archive admin has the same filters and search fields; only the
+        # column used for sorting and the page differ.
+        query = request.GET.copy()
+        query.pop("o", None)
+        query.pop("p", None)
+        url = reverse("admin:orders_archivedorder_changelist")
+        return f"{url}?{query.urlencode()}" if query else url
+
+    def changelist_view(self, request, extra_context=None):
+        # Settled orders move to the archive over time, so searches also
+        # point to the archived orders that match.
+        search_term = request.GET.get(SEARCH_VAR, "")
+        if search_term:
+            archive_admin = self.admin_site.get_model_admin(ArchivedOrder)
+            archived_orders = archive_admin.get_search_results(
+                request,
+                ArchivedOrder.objects.all(),
+                search_term,
+            )[0]
+            if archived_orders.exists():
+                self.message_user(
+                    request,
+                    format_html(
+                        '{} <a href="{}">{}</a>',
+                        _("Há pedidos arquivados que correspondem à busca."),
+                        self.get_archived_orders_url(request),
+                        _("Ver pedidos arquivados"),
+                    ),
+                    messages.INFO,
+                )
+        extra_context = {
+            "archived_orders_url": self.get_archived_orders_url(request),
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        # Links to an order keep working after it has been archived.
+        if self.get_object(request, unquote(object_id)) is None:
+            archive_admin = self.admin_site.get_model_admin(ArchivedOrder)
+            archived_order = archive_admin.get_object(request, unquote(object_id))
+            if archived_order is not None:
+                return redirect(
+                    "admin:orders_archivedorder_change",
+                    quote(archived_order.pk),
+                )
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def get_export_rows(self, queryset):
+        items = OrderItem.objects.filter(order__in=queryset.values("pk")).order_by(
+            "-order__created",
+            "order_id",
+        )
+        return super().get_export_rows(items)
+
+    def _transition(self, request, queryset, status):
+        selected = queryset.count()
+        transitioned = len(queryset.transition(status))
+        self.message_user(
+            request,
+            _("%(count)d de %(selected)d pedido(s) marcado(s) como %(status)s.")
+            % {
+                "count": transitioned,
+                "selected": selected,
+                "status": status.label.lower(),
+            },
+            messages.SUCCESS if transitioned == selected else messages.WARNING,
+        )
+
+    @admin.action(description=_("Marcar pedidos selecionados como pagos"))
+    def mark_as_paid(self, request, queryset):
+        self._transition(request, queryset, OrderStatus.PAID)
+
+    @admin.action(description=_("Cancelar pedidos selecionados"))
+    def mark_as_cancelled(self, request, queryset):
+        self._transition(request, queryset, OrderStatus.CANCELLED)
+
+    def short_id(self, obj):
+        return str(obj.id)[:8]
+
+    short_id.short_description = _("Pedido")
+    short_id.admin_order_field = "id"
+
+    def total_amount_display(self, obj):
+        return f"R$ {formats.number_format(obj.total_amount, 2)}"
+
+    total_amount_display.short_description = _("Valor total")
+    total_amount_display.admin_order_field = "total_amount"
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    verbose_name = _("Item")
+    verbose_name_plural = _("Itens")
+    fields = (
+        "product",
+        "product_name",
+        "quantity",
+        "unit_price",
+    )
+    readonly_fields = fields
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = (
+        "short_id",
+        "user",
+        "status",
+        "created",
+        "archived_at",
+        "total_amount_display",
+        "item_count",
+    )
+    list_select_related = ["user"]
+    list_filter = [
+        "status",
+    ]
+    date_hierarchy = "created"
+    search_fields = [
+        "id",
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+    ]
+    readonly_fields = [
+        "user",
+        "status",
+        "created",
+        "modified",
+        "archived_at",
+        "total_amount",
+        "item_count",
+    ]
+    inlines = (ArchivedOrderItemInline,)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
     def short_id(self, obj):
         return str(obj.id)[:8]
+
+    short_id.short_description = _("Pedido")
+    short_id.admin_order_field = "id"
+
+    def total_amount_display(self, obj):
+        return f"R$ {formats.number_format(obj.total_amount, 2)}"
+
+    total_amount_display.short_description = _("Valor total")
+    total_amount_display.admin_order_field = "total_amount"
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        "day",
+        "category",
+        "status",
+        "order_count",
+        "item_count",
+        "revenue_display",
+    ]
+    list_filter = [
+        "status",
+        "category",
+    ]
+    date_hierarchy = "day"
+    readonly_fields = [
+        "day",
+        "category",
+        "status",
+        "order_count",
+        "item_count",
+        "revenue",
+        "computed_at",
+    ]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def revenue_display(self, obj):
+        return f"R$ {formats.number_format(obj.revenue, 2)}"
+
+    revenue_display.short_description = _("Receita")
+    revenue_display.admin_order_field = "revenue"
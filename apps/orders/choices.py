@@ -6,3 +6,10 @@ class OrderStatus(models.TextChoices):
     OPEN = "OPEN", _("Aberto")
     PAID = "PAID", _("Pago")
     CANCELLED = "CANCELLED", _("Cancelado")
+
+
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.OPEN: {OrderStatus.PAID, OrderStatus.CANCELLED},
+    OrderStatus.PAID: {OrderStatus.CANCELLED},
+    OrderStatus.CANCELLED: set(),
+}
@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class OrdersConfig(AppConfig):
     name = "apps.orders"
     verbose_name = _("Pedidos")
+
+    def ready(self):
+        import apps.orders.signals  # noqa: F401, PLC0415
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.orders.services import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move pedidos pagos ou cancelados antigos para as tabelas de arquivo."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.ORDERS_ARCHIVE_AFTER_DAYS,
+            help="Arquiva pedidos sem alterações há mais do que este número de dias.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Quantidade de pedidos arquivados por transação.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options["older_than_days"])
+        archived = archive_orders(
+            older_than=older_than,
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{archived} pedidos arquivados."))
@@ -0,0 +1,140 @@
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.orders.choices import OrderStatus
+from apps.orders.models import Order
+from apps.orders.models import OrderItem
+from apps.orders.services import archive_orders
+from apps.products.models import Product
+from apps.users.models import User
+
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera pedidos sintéticos e mede as consultas mais comuns antes e depois "
+        "de arquivar os pedidos antigos. Os dados são descartados no final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=100_000,
+            help="Quantidade de pedidos gerados.",
+        )
+        parser.add_argument(
+            "--active-ratio",
+            type=float,
+            default=0.05,
+            help="Fração dos pedidos que continua ativa depois do arquivamento.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Quantidade de pedidos gravados por lote.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Mantém os pedidos gerados em vez de descartá-los.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            customer = self.generate(options)
+            before = self.measure(customer)
+            started_at = time.monotonic()
+            archived = archive_orders(
+                older_than=timezone.now() - timedelta(days=30),
+                batch_size=5000,
+            )
+            archive_time = time.monotonic() - started_at
+            after = self.measure(customer)
+            transaction.set_rollback(not options["keep"])
+
+        self.stdout.write(
+            f"{archived} pedidos arquivados em {archive_time:.1f}s.",
+        )
+        for name, elapsed in before.items():
+            self.stdout.write(
+                f"{name}: {elapsed * 1000:.1f}ms antes, "
+                f"{after[name] * 1000:.1f}ms depois",
+            )
+
+    def generate(self, options):
+        total = options["orders"]
+        batch_size = options["batch_size"]
+        active = int(total * options["active_ratio"])
+        now = timezone.now()
+        customer = User.objects.create_user(email=f"{uuid.uuid4().hex}@example.com")
+        product = Product.objects.create(
+            name="Produto de teste",
+            slug=f"produto-{uuid.uuid4().hex}",
+            category="OTHER",
+            price=Decimal("10.00"),
+        )
+        for start in range(0, total, batch_size):
+            orders = []
+            for i in range(start, min(start + batch_size, total)):
+                # The newest orders are still being worked on; the rest are
+                # settled and old enough to be archived.
+                is_active = i >= total - active
+                created = now - timedelta(days=1 if is_active else 60 + i % 700)
+                orders.append(
+                    Order(
+                        user=customer if i % 1000 == 0 else None,
+                        status=OrderStatus.OPEN if is_active else OrderStatus.PAID,
+                        total_amount=Decimal("10.00"),
+                        item_count=1,
+                        created=created,
+                    ),
+                )
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        product=product,
+                        product_name=product.name,
+                        unit_price=product.price,
+                    )
+                    for order in orders
+                ],
+            )
+            # Inserting the items refreshes the order totals, which sets
+            # modified to now.
+            Order.objects.filter(pk__in=[order.pk for order in orders]).update(
+                modified=F("created"),
+            )
+            self.stdout.write(f"{start + len(orders)} pedidos gerados...")
+        return customer
+
+    def measure(self, customer):
+        queries = {
+            "Contagem da listagem do admin": lambda: Order.objects.count(),
+            "Primeira página do admin": lambda: list(
+                Order.objects.select_related("user")[:PAGE_SIZE],
+            ),
+            "Contagem de pedidos abertos": lambda: Order.objects.filter(
+                status=OrderStatus.OPEN,
+            ).count(),
+            "Histórico do cliente": lambda: list(
+                Order.objects.filter(user=customer)[:10],
+            ),
+        }
+        timings = {}
+        for name, query in queries.items():
+            started_at = time.monotonic()
+            query()
+            timings[name] = time.monotonic() - started_at
+        return timings
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Recalcula o valor total e a quantidade de itens armazenados nos pedidos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de pedidos atualizados por transação.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recalcula todos os pedidos, e não apenas os divergentes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Order.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.drifted()
+        updated = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Order.objects.filter(pk__in=pks).refresh_totals()
+            last_pk = pks[-1]
+            self.stdout.write(f"{updated} pedidos recalculados...")
+        self.stdout.write(self.style.SUCCESS(f"{updated} pedidos recalculados."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.services import update_daily_sales_rollups
+
+
+class Command(BaseCommand):
+    help = "Atualiza o resumo de vendas diárias dos dias alterados."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recalcula todo o histórico de pedidos.",
+        )
+        parser.add_argument(
+            "--batch-days",
+            type=int,
+            default=31,
+            help="Quantidade de dias recalculados por transação.",
+        )
+
+    def handle(self, *args, **options):
+        days = update_daily_sales_rollups(
+            full=options["full"],
+            batch_days=options["batch_days"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{len(days)} dias recalculados."))
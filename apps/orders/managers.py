@@ -0,0 +1,210 @@
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import models
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import DecimalField
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import PositiveIntegerField
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+
+from .choices import ORDER_STATUS_TRANSITIONS
+from .choices import OrderStatus
+
+
+class BaseOrderQuerySet(models.QuerySet):
+    def _items_subquery(self, aggregate, output_field):
+        item_model = self.model._meta.get_field("items").related_model  # noqa: SLF001
+        items = (
+            item_model.objects.filter(order=OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+        return Subquery(items, output_field=output_field)
+
+    def total_amount_expression(self):
+        output_field = DecimalField(max_digits=12, decimal_places=2)
+        return Coalesce(
+            self._items_subquery(
+                Sum(F("quantity") * F("unit_price"), output_field=output_field),
+                output_field,
+            ),
+            Value(Decimal("0.00")),
+            output_field=output_field,
+        )
+
+    def number_of_items_expression(self):
+        output_field = PositiveIntegerField()
+        return Coalesce(
+            self._items_subquery(Sum("quantity"), output_field),
+            Value(0),
+            output_field=output_field,
+        )
+
+    def line_count_expression(self):
+        output_field = PositiveIntegerField()
+        return Coalesce(
+            self._items_subquery(Count("pk"), output_field),
+            Value(0),
+            output_field=output_field,
+        )
+
+    def with_totals(self):
+        return self.annotate(
+            annotated_total_amount=self.total_amount_expression(),
+            annotated_number_of_items=self.number_of_items_expression(),
+        )
+
+
+class OrderQuerySet(BaseOrderQuerySet):
+    def drifted(self):
+        return self.with_totals().exclude(
+            total_amount=F("annotated_total_amount"),
+            item_count=F("annotated_number_of_items"),
+        )
+
+    def refresh_totals(self):
+        return self.update(
+            total_amount=self.total_amount_expression(),
+            item_count=self.number_of_items_expression(),
+            modified=timezone.now(),
+        )
+
+    def transition(self, status):
+        sources = [
+            source
+            for source, targets in ORDER_STATUS_TRANSITIONS.items()
+            if status in targets
+        ]
+        if not sources:
+            msg = f"No order status can transition to '{status}'"
+            raise ValueError(msg)
+        with transaction.atomic(using=self.db):
+            order_ids = list(
+                self.filter(status__in=sources)
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", flat=True),
+            )
+            if not order_ids:
+                return []
+            self.model.objects.using(self.db).filter(
+                pk__in=order_ids,
+                status__in=sources,
+            ).update(status=status, modified=timezone.now())
+            if status == OrderStatus.CANCELLED:
+                self._restock(order_ids)
+        return order_ids
+
+    def _restock(self, order_ids):
+        OrderItem = apps.get_model("orders", "OrderItem")
+        Product = apps.get_model("products", "Product")
+        quantities = dict(
+            OrderItem.objects.using(self.db)
+            .filter(order_id__in=order_ids, product__isnull=False)
+            .order_by("product")
+            .values("product")
+            .annotate(quantity=Sum("quantity"))
+            .values_list("product", "quantity"),
+        )
+        if not quantities:
+            return
+        Product.objects.using(self.db).filter(pk__in=quantities).update(
+            stock=F("stock")
+            + Case(
+                *(
+                    When(pk=product_id, then=Value(quantity))
+                    for product_id, quantity in quantities.items()
+                ),
+                default=Value(0),
+            ),
+        )
+        surrogate_keys = [get_surrogate_key(Product, pk) for pk in quantities]
+        transaction.on_commit(
+            lambda: purge_surrogate_keys(*surrogate_keys),
+            using=self.db,
+        )
+
+
+class OrderItemQuerySet(models.QuerySet):
+    def _refresh_order_totals(self, order_ids):
+        order_ids = {order_id for order_id in order_ids if order_id is not None}
+        if order_ids:
+            Order = apps.get_model("orders", "Order")
+            Order.objects.using(self.db).filter(pk__in=order_ids).refresh_totals()
+
+    def _capture_product_snapshots(self, objs):
+        pending = [
+            obj for obj in objs if obj.unit_price is None and obj.product_id is not None
+        ]
+        if not pending:
+            return
+        Product = apps.get_model("products", "Product")
+        products = Product.objects.using(self.db).in_bulk(
+            {obj.product_id for obj in pending},
+        )
+        for obj in pending:
+            if obj.product_id in products:
+                obj.capture_product_snapshot(products[obj.product_id])
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self._capture_product_snapshots(objs)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            self._refresh_order_totals(obj.order_id for obj in objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            order_ids = set(
+                self.filter(pk__in=[obj.pk for obj in objs]).values_list(
+                    "order_id",
+                    flat=True,
+                ),
+            )
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            self._refresh_order_totals(order_ids | {obj.order_id for obj in objs})
+        return rows
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            order_ids = set(self.values_list("order_id", flat=True))
+            rows = super().update(**kwargs)
+            if "order" in kwargs:
+                order_ids.add(getattr(kwargs["order"], "pk", kwargs["order"]))
+            if "order_id" in kwargs:
+                order_ids.add(kwargs["order_id"])
+            self._refresh_order_totals(order_ids)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            order_ids = set(self.values_list("order_id", flat=True))
+            deleted = super().delete()
+            self._refresh_order_totals(order_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+OrderManager = models.Manager.from_queryset(OrderQuerySet)
+ArchivedOrderManager = models.Manager.from_queryset(BaseOrderQuerySet)
+OrderItemManager = models.Manager.from_queryset(OrderItemQuerySet)
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:56
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+
+    def items_subquery(expression, output_field):
+        items = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .order_by()
+            .values('order')
+            .annotate(value=Sum(expression, output_field=output_field))
+            .values('value')
+        )
+        return Coalesce(
+            Subquery(items, output_field=output_field),
+            Value(output_field.to_python(0)),
+            output_field=output_field,
+        )
+
+    Order.objects.update(
+        total_amount=items_subquery(
+            F('quantity') * F('product__price'),
+            models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+        item_count=items_subquery(F('quantity'), models.PositiveIntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Quantidade de itens'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Valor total'),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_product_snapshot(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    queryset = (
+        OrderItem.objects.filter(unit_price__isnull=True, product__isnull=False)
+        .select_related('product')
+        .only('pk', 'product__name', 'product__price')
+        .order_by('pk')
+    )
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        items = list(batch[:BATCH_SIZE])
+        if not items:
+            break
+        for item in items:
+            item.product_name = item.product.name
+            item.unit_price = item.product.price
+        OrderItem.objects.bulk_update(items, ['product_name', 'unit_price'])
+        last_pk = items[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_item_count_order_total_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, editable=False, max_length=200, verbose_name='Nome do produto'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Preço unitário'),
+        ),
+        migrations.RunPython(backfill_product_snapshot, migrations.RunPython.noop),
+    ]
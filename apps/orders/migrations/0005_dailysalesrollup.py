@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('category', models.CharField(choices=[('ELECTRONICS', 'Electrônicos'), ('FASHION', 'Moda'), ('HOME', 'Casa'), ('BEAUTY', 'Beleza'), ('SPORTS', 'Esportes'), ('TOYS', 'Brinquedos'), ('BOOKS', 'Livros'), ('MUSIC', 'Música'), ('GROCERY', 'Mercearia'), ('AUTOMOTIVE', 'Automotivo'), ('HEALTH', 'Saúde'), ('OFFICE', 'Escritório'), ('PETS', 'Animais de Estimação'), ('BABY', 'Bebê'), ('GARDEN', 'Jardim'), ('TOOLS', 'Ferramentas'), ('JEWELRY', 'Joias'), ('OTHER', 'Outros')], max_length=50, verbose_name='Departamento')),
+                ('status', models.CharField(choices=[('OPEN', 'Aberto'), ('PAID', 'Pago'), ('CANCELLED', 'Cancelado')], max_length=20, verbose_name='Status')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Pedidos')),
+                ('item_count', models.PositiveIntegerField(default=0, verbose_name='Itens')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Receita')),
+                ('computed_at', models.DateTimeField(db_index=True, verbose_name='Calculado em')),
+            ],
+            options={
+                'verbose_name': 'Venda diária',
+                'verbose_name_plural': 'Vendas diárias',
+                'ordering': ['-day', 'category', 'status'],
+                'unique_together': {('day', 'category', 'status')},
+            },
+        ),
+    ]
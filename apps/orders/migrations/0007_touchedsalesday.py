@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_archived_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TouchedSalesDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Dia de vendas alterado',
+                'verbose_name_plural': 'Dias de vendas alterados',
+                'ordering': ['day'],
+            },
+        ),
+    ]
@@ -3,30 +3,29 @@ import uuid
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db import transaction
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from model_utils.models import TimeStampedModel
 
+from apps.products.choices import Category
+
 from .choices import OrderStatus
+from .managers import ArchivedOrderManager
+from .managers import OrderItemManager
+from .managers import OrderManager
 
 User = get_user_model()
 
 
-class Order(TimeStampedModel):
+class BaseOrder(TimeStampedModel):
     id = models.UUIDField(
         verbose_name=_("ID"),
         primary_key=True,
         default=uuid.uuid4,
         editable=False,
     )
-    user = models.ForeignKey(
-        to=User,
-        verbose_name=_("Usuário"),
-        related_name="orders",
-        on_delete=models.SET_NULL,
-        blank=True,
-        null=True,
-    )
     status = models.CharField(
         verbose_name=_("Status"),
         max_length=20,
@@ -34,37 +33,123 @@ class Order(TimeStampedModel):
         default=OrderStatus.OPEN,
         db_index=True,
     )
+    total_amount = models.DecimalField(
+        verbose_name=_("Valor total"),
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        db_index=True,
+    )
+    item_count = models.PositiveIntegerField(
+        verbose_name=_("Quantidade de itens"),
+        default=0,
+        editable=False,
+    )
 
     class Meta:
-        verbose_name = _("Pedido")
-        verbose_name_plural = _("Pedidos")
-        ordering = ["-created"]
+        abstract = True
 
     def __str__(self):
         return f"Pedido #{str(self.id)[:8]}"
 
-    def get_absolute_url(self):
-        return reverse("orders:order_detail", kwargs={"pk": self.pk})
-
-    @property
-    def total_amount(self):
-        return sum(item.subtotal_amount for item in self.items.all())
-
     def get_total_amount_display(self):
         return f"R$ {self.total_amount:.2f}".replace(".", ",")
 
     @property
     def number_of_items(self):
-        return sum(item.quantity for item in self.items.all())
+        if hasattr(self, "annotated_number_of_items"):
+            return self.annotated_number_of_items
+        return self.item_count
+
+
+class Order(BaseOrder):
+    user = models.ForeignKey(
+        to=User,
+        verbose_name=_("Usuário"),
+        related_name="orders",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+
+    objects = OrderManager()
+
+    TOTAL_FIELDS = ("total_amount", "item_count")
 
+    class Meta:
+        verbose_name = _("Pedido")
+        verbose_name_plural = _("Pedidos")
+        ordering = ["-created"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-id"],
+                name="order_user_created_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Totals are maintained by OrderItem writes; a full save of a stale
+        # instance must not overwrite them.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOTAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def get_absolute_url(self):
+        return reverse("orders:order_detail", kwargs={"pk": self.pk})
+
+    def transition(self, status):
+        transitioned = Order.objects.filter(pk=self.pk).transition(status)
+        self.refresh_from_db(fields=["status", "modified"])
+        return bool(transitioned)
 
-class OrderItem(TimeStampedModel):
+
+class BaseOrderItem(TimeStampedModel):
     id = models.UUIDField(
         verbose_name=_("ID"),
         primary_key=True,
         default=uuid.uuid4,
         editable=False,
     )
+    quantity = models.PositiveIntegerField(
+        verbose_name=_("Quantidade"),
+        validators=[MinValueValidator(1)],
+        default=1,
+    )
+    product_name = models.CharField(
+        verbose_name=_("Nome do produto"),
+        max_length=200,
+        blank=True,
+        editable=False,
+    )
+    unit_price = models.DecimalField(
+        verbose_name=_("Preço unitário"),
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        name = self.product_name or _("Produto removido")
+        return f"Pedido #{str(self.order_id)[:8]} - {name} (x{self.quantity})"
+
+    @property
+    def subtotal_amount(self):
+        if self.unit_price is None:
+            return 0.00
+        return self.unit_price * self.quantity
+
+
+class OrderItem(BaseOrderItem):
     order = models.ForeignKey(
         to=Order,
         verbose_name=_("Pedido"),
@@ -79,11 +164,8 @@ class OrderItem(TimeStampedModel):
         blank=True,
         null=True,
     )
-    quantity = models.PositiveIntegerField(
-        verbose_name=_("Quantidade"),
-        validators=[MinValueValidator(1)],
-        default=1,
-    )
+
+    objects = OrderItemManager()
 
     class Meta:
         verbose_name = _("Item do pedido")
@@ -91,12 +173,154 @@ class OrderItem(TimeStampedModel):
         ordering = ["-created"]
         unique_together = ("order", "product")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "product_id" in field_names:
+            instance._loaded_product_id = instance.product_id  # noqa: SLF001
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Swapping the product on an existing item (e.g. in the admin inline)
+        # takes a new snapshot of its name and price.
+        loaded_product_id = getattr(self, "_loaded_product_id", self.product_id)
+        product_changed = (
+            not self._state.adding and self.product_id != loaded_product_id
+        )
+        if self.product and (self.unit_price is None or product_changed):
+            self.capture_product_snapshot(self.product)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Order.objects.filter(pk=self.order_id).refresh_totals()
+        self._loaded_product_id = self.product_id
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            Order.objects.filter(pk=self.order_id).refresh_totals()
+        return deleted
+
+    def capture_product_snapshot(self, product):
+        self.product_name = product.name
+        self.unit_price = product.price
+
+
+class ArchivedOrder(BaseOrder):
+    user = models.ForeignKey(
+        to=User,
+        verbose_name=_("Usuário"),
+        related_name="archived_orders",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    archived_at = models.DateTimeField(
+        verbose_name=_("Arquivado em"),
+        default=timezone.now,
+        editable=False,
+    )
+
+    objects = ArchivedOrderManager()
+
+    class Meta:
+        verbose_name = _("Pedido arquivado")
+        verbose_name_plural = _("Pedidos arquivados")
+        ordering = ["-created"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-id"],
+                name="archived_order_user_idx",
+            ),
+            models.Index(
+                fields=["created"],
+                name="archived_order_created_idx",
+            ),
+        ]
+
+
+class ArchivedOrderItem(BaseOrderItem):
+    order = models.ForeignKey(
+        to=ArchivedOrder,
+        verbose_name=_("Pedido"),
+        related_name="items",
+        on_delete=models.CASCADE,
+    )
+    product = models.ForeignKey(
+        to="products.Product",
+        verbose_name=_("Produto"),
+        related_name="archived_order_items",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("Item de pedido arquivado")
+        verbose_name_plural = _("Itens de pedidos arquivados")
+        ordering = ["-created"]
+        unique_together = ("order", "product")
+
+
+class DailySalesRollup(models.Model):
+    day = models.DateField(
+        verbose_name=_("Dia"),
+    )
+    category = models.CharField(
+        verbose_name=_("Departamento"),
+        max_length=50,
+        choices=Category.choices,
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=20,
+        choices=OrderStatus.choices,
+    )
+    order_count = models.PositiveIntegerField(
+        verbose_name=_("Pedidos"),
+        default=0,
+    )
+    item_count = models.PositiveIntegerField(
+        verbose_name=_("Itens"),
+        default=0,
+    )
+    revenue = models.DecimalField(
+        verbose_name=_("Receita"),
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+    )
+    computed_at = models.DateTimeField(
+        verbose_name=_("Calculado em"),
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = _("Venda diária")
+        verbose_name_plural = _("Vendas diárias")
+        ordering = ["-day", "category", "status"]
+        unique_together = ("day", "category", "status")
+
     def __str__(self):
-        name = self.product.name if self.product else _("Produto removido")
-        return f"Pedido #{str(self.order.id)[:8]} - {name} (x{self.quantity})"
+        category = self.get_category_display()
+        return f"{self.day} - {category} ({self.get_status_display()})"
 
-    @property
-    def subtotal_amount(self):
-        if not self.product:
-            return 0.00
-        return self.product.price * self.quantity
+
+class TouchedSalesDay(models.Model):
+    # Days whose rollups are out of date without any order left to carry a
+    # newer modified timestamp, e.g. because an order was deleted.
+    day = models.DateField(
+        verbose_name=_("Dia"),
+    )
+    created = models.DateTimeField(
+        verbose_name=_("Criado em"),
+        default=timezone.now,
+        editable=False,
+    )
+
+    class Meta:
+        verbose_name = _("Dia de vendas alterado")
+        verbose_name_plural = _("Dias de vendas alterados")
+        ordering = ["day"]
+
+    def __str__(self):
+        return str(self.day)
@@ -0,0 +1,273 @@
+from datetime import timedelta
+from itertools import batched
+
+from django.conf import settings
+from django.db import models
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import DecimalField
+from django.db.models import F
+from django.db.models import Max
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+from apps.products.choices import Category
+from apps.products.models import Product
+from apps.products.reservations import get_stock_reservations
+
+from .choices import OrderStatus
+from .models import ArchivedOrder
+from .models import ArchivedOrderItem
+from .models import DailySalesRollup
+from .models import Order
+from .models import OrderItem
+from .models import TouchedSalesDay
+
+ARCHIVABLE_STATUSES = (OrderStatus.PAID, OrderStatus.CANCELLED)
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class InsufficientStockError(CheckoutError):
+    def __init__(self, product_id):
+        self.product_id = product_id
+        msg = _("Estoque insuficiente para o produto %(product)s.") % {
+            "product": product_id,
+        }
+        super().__init__(msg)
+
+
+def _normalize_quantities(quantities):
+    to_python = Product._meta.pk.to_python  # noqa: SLF001
+    normalized = {}
+    for product_id, quantity in quantities.items():
+        if quantity < 1:
+            msg = _("A quantidade deve ser maior que zero.")
+            raise CheckoutError(msg)
+        key = to_python(product_id)
+        normalized[key] = normalized.get(key, 0) + quantity
+    if not normalized:
+        msg = _("O carrinho está vazio.")
+        raise CheckoutError(msg)
+    return normalized
+
+
+def reserve_stock(quantities, reserved=None):
+    # Rows are decremented in a fixed (primary key) order so that concurrent
+    # checkouts sharing products always lock them in the same sequence.
+    reserved = reserved or {}
+    for product_id in sorted(quantities, key=str):
+        quantity = quantities[product_id]
+        # Units other customers hold in their carts are not for sale.
+        minimum_stock = quantity + reserved.get(product_id, 0)
+        updated = Product.objects.filter(
+            pk=product_id,
+            stock__gte=minimum_stock,
+        ).update(stock=F("stock") - quantity)
+        if not updated:
+            raise InsufficientStockError(product_id)
+
+
+def get_checkout_holds(reservations, user, quantities, reservation_ids):
+    to_python = Product._meta.pk.to_python  # noqa: SLF001
+    return {
+        reservation_id: hold
+        for reservation_id, hold in reservations.get_holds(
+            reservation_ids,
+            owner=user,
+        ).items()
+        if to_python(hold.product_id) in quantities
+    }
+
+
+def get_reserved_by_others(reservations, quantities, holds):
+    reserved = reservations.get_reserved(quantities, sweep=True)
+    for hold in holds.values():
+        reserved[hold.product_id] -= hold.quantity
+    return {product_id: max(reserved[str(product_id)], 0) for product_id in quantities}
+
+
+def _release_reservations(reservations, reservation_ids):
+    for reservation_id in reservation_ids:
+        reservations.release(reservation_id)
+
+
+@transaction.atomic
+def place_order(user, quantities, reservation_ids=()):
+    quantities = _normalize_quantities(quantities)
+    reservations = get_stock_reservations()
+    # Only the customer's own holds on products in this order are spent by it.
+    holds = get_checkout_holds(reservations, user, quantities, reservation_ids)
+    reserve_stock(quantities, get_reserved_by_others(reservations, quantities, holds))
+    products = Product.objects.only("name", "price").in_bulk(quantities)
+    order = Order.objects.create(user=user)
+    items = []
+    for product_id, quantity in quantities.items():
+        item = OrderItem(order=order, product_id=product_id, quantity=quantity)
+        item.capture_product_snapshot(products[product_id])
+        items.append(item)
+    OrderItem.objects.bulk_create(items)
+    order.refresh_from_db(fields=["total_amount", "item_count", "modified"])
+    # The stock update skips post_save, so cached product pages are purged here.
+    surrogate_keys = [get_surrogate_key(Product, pk) for pk in quantities]
+    transaction.on_commit(lambda: purge_surrogate_keys(*surrogate_keys))
+    if holds:
+        transaction.on_commit(lambda: _release_reservations(reservations, holds))
+    return order
+
+
+def get_touched_sales_days(since=None):
+    days = set()
+    for model in (Order, ArchivedOrder):
+        orders = model.objects.order_by()
+        if since is not None:
+            orders = orders.filter(modified__gte=since)
+        days.update(
+            orders.annotate(day=TruncDate("created"))
+            .values_list("day", flat=True)
+            .distinct(),
+        )
+    return sorted(days)
+
+
+def _aggregate_daily_sales(item_model, days):
+    return (
+        item_model.objects.filter(order__created__date__in=days)
+        .order_by()
+        .annotate(
+            day=TruncDate("order__created"),
+            rollup_category=Coalesce("product__category", Value(Category.OTHER)),
+            rollup_status=F("order__status"),
+        )
+        .values("day", "rollup_category", "rollup_status")
+        .annotate(
+            order_count=Count("order", distinct=True),
+            item_count=Sum("quantity"),
+            revenue=Coalesce(
+                Sum(
+                    F("quantity") * F("unit_price"),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+                Value(0),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+    )
+
+
+def aggregate_daily_sales(days):
+    # An order lives in exactly one of the tables, so per-table distinct order
+    # counts can simply be added together.
+    totals = {}
+    for item_model in (OrderItem, ArchivedOrderItem):
+        for row in _aggregate_daily_sales(item_model, days):
+            key = (row["day"], row["rollup_category"], row["rollup_status"])
+            if key in totals:
+                for field in ("order_count", "item_count", "revenue"):
+                    totals[key][field] += row[field]
+            else:
+                totals[key] = row
+    return list(totals.values())
+
+
+def update_daily_sales_rollups(*, full=False, batch_days=31):
+    computed_at = timezone.now()
+    watermark = None
+    if not full:
+        watermark = DailySalesRollup.objects.aggregate(
+            watermark=Max("computed_at"),
+        )["watermark"]
+    if watermark is not None:
+        # modified is set when a row is written, not when its transaction
+        # commits, so recent rows are read again by the next run.
+        watermark -= timedelta(seconds=settings.ORDERS_ROLLUP_WATERMARK_MARGIN)
+    touched = list(TouchedSalesDay.objects.values_list("pk", "day"))
+    days = sorted(
+        {*get_touched_sales_days(since=watermark), *(day for _, day in touched)},
+    )
+    for batch in batched(days, batch_days):
+        rollups = [
+            DailySalesRollup(
+                day=row["day"],
+                category=row["rollup_category"],
+                status=row["rollup_status"],
+                order_count=row["order_count"],
+                item_count=row["item_count"],
+                revenue=row["revenue"],
+                computed_at=computed_at,
+            )
+            for row in aggregate_daily_sales(batch)
+        ]
+        with transaction.atomic():
+            DailySalesRollup.objects.filter(day__in=batch).delete()
+            DailySalesRollup.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=["day", "category", "status"],
+                update_fields=["order_count", "item_count", "revenue", "computed_at"],
+            )
+    TouchedSalesDay.objects.filter(pk__in=[pk for pk, _ in touched]).delete()
+    return days
+
+
+def _copy_to_archive(instance, archive_model, **extra):
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in archive_model._meta.concrete_fields  # noqa: SLF001
+        if hasattr(instance, field.attname)
+    }
+    return archive_model(**values, **extra)
+
+
+def archive_orders(*, older_than=None, batch_size=500):
+    if older_than is None:
+        older_than = timezone.now() - timedelta(
+            days=settings.ORDERS_ARCHIVE_AFTER_DAYS,
+        )
+    archived = 0
+    last_pk = None
+    while True:
+        with transaction.atomic():
+            orders = Order.objects.filter(
+                status__in=ARCHIVABLE_STATUSES,
+                modified__lt=older_than,
+            )
+            if last_pk is not None:
+                orders = orders.filter(pk__gt=last_pk)
+            # Rows being checked out or transitioned right now are skipped and
+            # picked up by the next run.
+            batch = list(
+                orders.select_for_update(skip_locked=True).order_by("pk")[:batch_size],
+            )
+            if not batch:
+                break
+            archived_at = timezone.now()
+            ArchivedOrder.objects.bulk_create(
+                [
+                    _copy_to_archive(order, ArchivedOrder, archived_at=archived_at)
+                    for order in batch
+                ],
+            )
+            ArchivedOrderItem.objects.bulk_create(
+                [
+                    _copy_to_archive(item, ArchivedOrderItem)
+                    for item in OrderItem.objects.filter(order__in=batch)
+                ],
+            )
+            # Deleting through the base queryset avoids refreshing totals of
+            # orders that are going away with their items.
+            models.QuerySet(OrderItem).filter(order__in=batch).delete()
+            archived_orders = Order.objects.filter(pk__in=[order.pk for order in batch])
+            archived_orders.archiving = True
+            archived_orders.delete()
+        archived += len(batch)
+        last_pk = batch[-1].pk
+    return archived
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ArchivedOrder
+from .models import Order
+from .models import TouchedSalesDay
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=ArchivedOrder)
+def touch_sales_day_on_delete(sender, instance, **kwargs):
+    # Archiving moves orders between tables without changing any day's sales.
+    if getattr(kwargs.get("origin"), "archiving", False):
+        return
+    TouchedSalesDay.objects.create(day=timezone.localdate(instance.created))
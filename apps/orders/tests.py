@@ -0,0 +1,321 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from unittest import mock
+
+from django.db import OperationalError
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.views import OrderListView
+from apps.products.models import Product
+from apps.products.reservations import LocalReservationStore
+from apps.products.reservations import StockReservations
+from apps.users.models import User
+
+from .admin import OrderAdmin
+from .choices import OrderStatus
+from .models import ArchivedOrder
+from .models import DailySalesRollup
+from .models import Order
+from .models import OrderItem
+from .models import TouchedSalesDay
+from .services import InsufficientStockError
+from .services import archive_orders
+from .services import place_order
+from .services import update_daily_sales_rollups
+
+
+def create_product(slug, price="10.00", stock=10):
+    return Product.objects.create(
+        name=slug.title(),
+        slug=slug,
+        category="OTHER",
+        price=Decimal(price),
+        stock=stock,
+    )
+
+
+def create_order(user, products):
+    order = Order.objects.create(user=user)
+    for product in products:
+        OrderItem.objects.create(order=order, product=product)
+    return order
+
+
+class OrderItemSnapshotTests(TestCase):
+    def test_snapshot_is_taken_on_create(self):
+        product = create_product("caneca", "12.50")
+        item = OrderItem.objects.create(order=Order.objects.create(), product=product)
+        assert item.product_name == "Caneca"
+        assert item.unit_price == Decimal("12.50")
+
+    def test_snapshot_is_kept_when_product_price_changes(self):
+        product = create_product("caneca", "12.50")
+        item = OrderItem.objects.create(order=Order.objects.create(), product=product)
+        Product.objects.filter(pk=product.pk).update(price=Decimal("20.00"))
+        item = OrderItem.objects.get(pk=item.pk)
+        item.quantity = 2
+        item.save()
+        assert item.unit_price == Decimal("12.50")
+
+    def test_snapshot_is_retaken_when_product_changes(self):
+        order = Order.objects.create()
+        item = OrderItem.objects.create(
+            order=order,
+            product=create_product("caneca", "12.50"),
+        )
+        item = OrderItem.objects.get(pk=item.pk)
+        item.product = create_product("camiseta", "59.90")
+        item.save()
+        item.refresh_from_db()
+        order.refresh_from_db()
+        assert item.product_name == "Camiseta"
+        assert item.unit_price == Decimal("59.90")
+        assert order.total_amount == Decimal("59.90")
+
+
+class OrderAdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com")
+        self.client.force_login(self.admin)
+        self.products = [create_product(f"produto-{i}") for i in range(3)]
+
+    def test_query_count_does_not_grow_with_rows(self):
+        url = reverse("admin:orders_order_changelist")
+        for page_size in (5, 100):
+            for _ in range(6):
+                create_order(self.admin, self.products)
+            with (
+                mock.patch.object(OrderAdmin, "list_per_page", page_size),
+                self.assertNumQueries(9),
+            ):
+                response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+
+    def test_computed_columns_are_sortable(self):
+        create_order(self.admin, self.products[:1])
+        create_order(self.admin, self.products)
+        url = reverse("admin:orders_order_changelist")
+        columns = OrderAdmin.list_display
+        for field in ("total_amount_display", "item_count"):
+            response = self.client.get(url, {"o": columns.index(field) + 1})
+            counts = [order.item_count for order in response.context["cl"].result_list]
+            assert counts == [1, 3]
+
+
+class OrderListQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cliente@example.com")
+        self.client.force_login(self.user)
+        self.products = [create_product(f"produto-{i}") for i in range(5)]
+        self.url = reverse("accounts:order_list")
+
+    def test_query_count_does_not_grow_with_orders(self):
+        page_size = OrderListView.paginate_by
+        for count in (1, page_size, page_size + 5):
+            while Order.objects.count() < count:
+                create_order(self.user, self.products)
+            for headers in ({}, {"HX-Request": "true"}):
+                with self.assertNumQueries(8):
+                    response = self.client.get(self.url, headers=headers)
+                assert len(response.context["orders"]) == min(count, page_size)
+
+    def test_page_shows_item_previews(self):
+        create_order(self.user, self.products)
+        response = self.client.get(self.url, headers={"HX-Request": "true"})
+        (order,) = response.context["orders"]
+        preview_count = OrderListView.preview_items_count
+        more_count = len(self.products) - preview_count
+        assert len(order.preview_items) == preview_count
+        assert order.more_items_count == more_count
+        self.assertContains(response, f"+{more_count}")
+
+
+class PlaceOrderReservationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cliente@example.com")
+        self.other_user = User.objects.create_user(email="outro@example.com")
+        self.product = create_product("caneca", stock=5)
+        self.reservations = StockReservations(LocalReservationStore())
+        patcher = mock.patch(
+            "apps.orders.services.get_stock_reservations",
+            return_value=self.reservations,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_other_customers_holds_are_not_for_sale(self):
+        stock = self.product.stock
+        self.reservations.reserve(self.product, stock - 1, owner=self.other_user)
+        with self.assertRaises(InsufficientStockError):  # noqa: PT027
+            place_order(self.user, {self.product.pk: 2})
+        place_order(self.user, {self.product.pk: 1})
+        self.product.refresh_from_db()
+        assert self.product.stock == stock - 1
+
+    def test_own_hold_is_spent_and_released(self):
+        reservation_id = self.reservations.reserve(self.product, 5, owner=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.user, {self.product.pk: 5}, [reservation_id])
+        self.product.refresh_from_db()
+        assert self.product.stock == 0
+        assert self.reservations.get_reserved([self.product.pk]) == {
+            str(self.product.pk): 0,
+        }
+
+    def test_foreign_holds_are_not_released(self):
+        reservation_id = self.reservations.reserve(
+            self.product,
+            2,
+            owner=self.other_user,
+        )
+        other_product = create_product("camiseta", stock=5)
+        own_reservation_id = self.reservations.reserve(
+            other_product,
+            1,
+            owner=self.user,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(
+                self.user,
+                {self.product.pk: 1},
+                [reservation_id, own_reservation_id],
+            )
+        # Neither the other customer's hold nor a hold on a product outside
+        # the order is touched.
+        reserved = self.reservations.get_reserved([self.product.pk, other_product.pk])
+        assert reserved == {str(self.product.pk): 2, str(other_product.pk): 1}
+
+
+class PlaceOrderConcurrencyTests(TransactionTestCase):
+    workers = 8
+    attempts = 40
+
+    def place_orders(self, products, results):
+        try:
+            for attempt in range(self.attempts):
+                quantities = {product.pk: 1 + attempt % 2 for product in products}
+                # Alternate the order the products are listed in, so locks
+                # would be taken in opposite orders without the sorting.
+                if attempt % 2:
+                    quantities = dict(reversed(quantities.items()))
+                while True:
+                    try:
+                        place_order(None, quantities)
+                    except InsufficientStockError:
+                        results.append("sold out")
+                    except OperationalError:
+                        # SQLite locks the whole database; PostgreSQL waits.
+                        time.sleep(0.001)
+                        continue
+                    else:
+                        results.append("ok")
+                    break
+        finally:
+            connection.close()
+
+    def test_concurrent_checkouts_never_oversell(self):
+        products = [
+            create_product("caneca", stock=50),
+            create_product("camiseta", stock=30),
+        ]
+        results = []
+        threads = [
+            threading.Thread(target=self.place_orders, args=(products, results))
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == self.workers * self.attempts
+        assert "sold out" in results
+        for product in products:
+            initial_stock = product.stock
+            product.refresh_from_db()
+            sold = OrderItem.objects.filter(product=product).aggregate(
+                sold=Sum("quantity"),
+            )["sold"]
+            assert product.stock >= 0
+            assert sold + product.stock == initial_stock
+        assert Order.objects.count() == results.count("ok")
+
+
+class DailySalesRollupTests(TestCase):
+    def setUp(self):
+        self.products = [create_product("caneca")]
+
+    def get_revenue(self):
+        return DailySalesRollup.objects.aggregate(revenue=Sum("revenue"))["revenue"]
+
+    def test_orders_committed_after_a_run_are_picked_up(self):
+        create_order(None, self.products)
+        update_daily_sales_rollups()
+        computed_at = DailySalesRollup.objects.get().computed_at
+        # An order written before the run started, but committed after it
+        # read the table.
+        order = create_order(None, self.products)
+        Order.objects.filter(pk=order.pk).update(
+            modified=computed_at - timedelta(seconds=1),
+        )
+        update_daily_sales_rollups()
+        assert self.get_revenue() == Decimal("20.00")
+
+    def test_deleted_orders_are_removed_from_their_day(self):
+        create_order(None, self.products)
+        order = create_order(None, self.products)
+        # Neither order is recent enough to be re-read on its own.
+        Order.objects.update(modified=timezone.now() - timedelta(days=1))
+        update_daily_sales_rollups()
+        order.delete()
+        update_daily_sales_rollups()
+        assert self.get_revenue() == Decimal("10.00")
+        assert not TouchedSalesDay.objects.exists()
+
+    def test_archiving_does_not_touch_sales_days(self):
+        order = create_order(None, self.products)
+        Order.objects.filter(pk=order.pk).update(status=OrderStatus.PAID)
+        update_daily_sales_rollups()
+        assert archive_orders(older_than=timezone.now() + timedelta(days=1)) == 1
+        assert not TouchedSalesDay.objects.exists()
+        update_daily_sales_rollups(full=True)
+        assert self.get_revenue() == Decimal("10.00")
+
+
+class ArchivedOrderAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com")
+        self.client.force_login(self.admin)
+        self.customer = User.objects.create_user(email="cliente@example.com")
+        order = create_order(self.customer, [create_product("caneca")])
+        Order.objects.filter(pk=order.pk).update(status=OrderStatus.PAID)
+        archive_orders(older_than=timezone.now() + timedelta(days=1))
+        self.archived_order = ArchivedOrder.objects.get(pk=order.pk)
+
+    def test_links_to_archived_orders_keep_working(self):
+        url = reverse("admin:orders_order_change", args=[self.archived_order.pk])
+        response = self.client.get(url)
+        self.assertRedirects(
+            response,
+            reverse(
+                "admin:orders_archivedorder_change",
+                args=[self.archived_order.pk],
+            ),
+        )
+
+    def test_search_points_to_matching_archived_orders(self):
+        url = reverse("admin:orders_order_changelist")
+        response = self.client.get(url, {"q": "cliente@example.com", "o": "2"})
+        archive_url = reverse("admin:orders_archivedorder_changelist")
+        self.assertContains(response, f'href="{archive_url}?q=cliente%40example.com"')
+        assert len(response.context["cl"].result_list) == 0
+        response = self.client.get(url, {"q": "ninguem@example.com"})
+        self.assertNotContains(response, "Ver pedidos arquivados")
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.adminmixins import ExportMixin
+
 from .models import Product
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ExportMixin, admin.ModelAdmin):
     fieldsets = (
         (
             _("Detalhes do produto"),
@@ -49,3 +51,16 @@ class ProductAdmin(admin.ModelAdmin):
         "modified",
     ]
     list_per_page = 10
+    export_fields = [
+        ("id", _("ID")),
+        ("name", _("Nome")),
+        ("slug", _("Slug")),
+        ("category", _("Departamento")),
+        ("description", _("Descrição")),
+        ("price", _("Preço")),
+        ("stock", _("Estoque")),
+        ("image", _("Imagem")),
+        ("created", _("Criado em")),
+        ("modified", _("Modificado em")),
+    ]
+    export_filename = "produtos"
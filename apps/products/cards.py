@@ -0,0 +1,40 @@
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+CARD_TEMPLATE = "products/partials/product_card.html"
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_card_cache_key(product, variant):
+    # Stock moves through queryset updates that leave modified untouched, so
+    # the sold-out badge is keyed separately. Since the key covers everything
+    # the card shows, cards live in the write-once "cards" cache namespace.
+    return (
+        f"cards:product:{product.pk}:{get_language()}:"
+        f"{product.modified.timestamp()}:{int(product.in_stock)}:{variant}"
+    )
+
+
+def render_product_cards(products, sizes="50vw", *, cart=False):
+    variant = hashlib.md5(
+        f"{sizes}|{cart}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()[:12]
+    products = list(products)
+    keys = [get_card_cache_key(product, variant) for product in products]
+    cards = cache.get_many(keys)
+    rendered = {}
+    for key, product in zip(keys, products, strict=True):
+        if key not in cards:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE,
+                {"product": product, "sizes": sizes, "cart": cart},
+            ).strip()
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]  # noqa: S308
@@ -21,3 +21,11 @@ class Category(models.TextChoices):
     TOOLS = "TOOLS", _("Ferramentas")
     JEWELRY = "JEWELRY", _("Joias")
     OTHER = "OTHER", _("Outros")
+
+
+class ProductSort(models.TextChoices):
+    RELEVANCE = "relevance", _("Relevância")
+    NEWEST = "newest", _("Mais recentes")
+    PRICE_ASC = "price", _("Menor preço")
+    PRICE_DESC = "-price", _("Maior preço")
+    NAME = "name", _("Nome")
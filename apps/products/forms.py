@@ -1 +1,43 @@
 from django import forms
+from django.utils.translation import gettext_lazy as _
+
+from .choices import Category
+from .choices import ProductSort
+
+
+class ProductFilterForm(forms.Form):
+    category = forms.ChoiceField(
+        label=_("Departamento"),
+        choices=[("", _("Todos")), *Category.choices],
+        required=False,
+    )
+    min_price = forms.DecimalField(
+        label=_("Preço mínimo"),
+        min_value=0,
+        decimal_places=2,
+        required=False,
+    )
+    max_price = forms.DecimalField(
+        label=_("Preço máximo"),
+        min_value=0,
+        decimal_places=2,
+        required=False,
+    )
+    in_stock = forms.BooleanField(
+        label=_("Somente em estoque"),
+        required=False,
+    )
+    sort = forms.ChoiceField(
+        label=_("Ordenar por"),
+        choices=ProductSort.choices,
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_price = cleaned_data.get("min_price")
+        max_price = cleaned_data.get("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            msg = _("O preço máximo não pode ser menor que o preço mínimo.")
+            self.add_error("max_price", msg)
+        return cleaned_data
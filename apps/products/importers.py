@@ -0,0 +1,234 @@
+import csv
+import json
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db import router
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.pagecache import purge_surrogate_keys
+from apps.core.search import get_search_backend
+
+from .models import Product
+from .services import invalidate_category_counts
+from .services import invalidate_featured_products
+from .typeahead import typeahead
+
+IMPORT_FIELDS = ("slug", "name", "category", "description", "price", "stock")
+REQUIRED_FIELDS = ("slug", "name", "category", "price")
+# Product columns that no import field fills in.
+INSERT_DEFAULT_FIELDS = ("image", "renditions")
+STAGING_TABLE = "products_product_import"
+
+
+def read_rows(file, file_format):
+    if file_format == "csv":
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = e
+        yield row
+
+
+def clean_row(row):
+    if isinstance(row, Exception):
+        raise ValidationError(str(row))
+    if not isinstance(row, dict):
+        raise ValidationError(_("Cada linha deve ser um objeto JSON."))
+    values = {}
+    errors = {}
+    for name in IMPORT_FIELDS:
+        if name not in row and name not in REQUIRED_FIELDS:
+            # Columns left out of the file keep their current values.
+            continue
+        field = Product._meta.get_field(name)  # noqa: SLF001
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, "") and name not in REQUIRED_FIELDS:
+            values[name] = field.get_default()
+            continue
+        try:
+            values[name] = field.clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+def get_update_fields(fields):
+    return [*(name for name in fields if name != "slug"), "modified"]
+
+
+class ProductImport:
+    def __init__(self, rows, *, batch_size=1000, on_error=None, on_progress=None):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.read = 0
+        self.invalid = 0
+        self.imported = 0
+        self.backend = get_search_backend(Product)
+
+    def clean_rows(self):
+        for number, row in enumerate(self.rows, start=1):
+            self.read = number
+            try:
+                yield clean_row(row)
+            except ValidationError as e:
+                self.invalid += 1
+                if self.on_error:
+                    self.on_error(number, e)
+            if self.on_progress and number % self.batch_size == 0:
+                self.on_progress(self)
+
+    def run(self):
+        batch = {}
+        for values in self.clean_rows():
+            # A slug repeated inside one batch would hit the same row twice in
+            # a single upsert; the last occurrence wins, as it would across
+            # batches.
+            batch[values["slug"]] = values
+            if len(batch) >= self.batch_size:
+                self.upsert(batch)
+                batch = {}
+        if batch:
+            self.upsert(batch)
+        self.finish()
+        return self.imported
+
+    def upsert(self, batch):
+        # Rows only overwrite the fields they provide, so they are grouped by
+        # them; new products get the model defaults for the rest.
+        groups = defaultdict(list)
+        for values in batch.values():
+            groups[tuple(values)].append(Product(**values))
+        with transaction.atomic():
+            for fields, products in groups.items():
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=["slug"],
+                    update_fields=get_update_fields(fields),
+                )
+            self.backend.update_index(Product.objects.filter(slug__in=batch))
+        self.imported += len(batch)
+
+    def run_copy(self):
+        connection = connections[router.db_for_write(Product)]
+        quote_name = connection.ops.quote_name
+        opts = Product._meta  # noqa: SLF001
+        table = quote_name(opts.db_table)
+        staging = quote_name(STAGING_TABLE)
+        slug = quote_name(opts.get_field("slug").column)
+        columns = ", ".join(quote_name(opts.get_field(f).column) for f in IMPORT_FIELDS)
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "  # noqa: S608
+                f"SELECT {columns} FROM {table} WITH NO DATA",
+            )
+            cursor.execute(
+                f"ALTER TABLE {staging} ADD COLUMN position bigserial, "
+                f"ADD COLUMN fields text",
+            )
+            with cursor.copy(
+                f"COPY {staging} ({columns}, fields) FROM STDIN",
+            ) as copy:
+                for values in self.clean_rows():
+                    copy.write_row(
+                        [
+                            *(values.get(name) for name in IMPORT_FIELDS),
+                            ",".join(values),
+                        ],
+                    )
+            # The last occurrence of a slug wins, as in run().
+            cursor.execute(
+                f"DELETE FROM {staging} AS a USING {staging} AS b "  # noqa: S608
+                f"WHERE a.{slug} = b.{slug} AND a.position < b.position",
+            )
+            cursor.execute(f"SELECT DISTINCT fields FROM {staging}")  # noqa: S608
+            self.imported = 0
+            for (fields,) in cursor.fetchall():
+                self.imported += self.insert_from_staging(
+                    cursor,
+                    connection,
+                    fields.split(","),
+                )
+            self.backend.update_index(
+                Product.objects.filter(
+                    slug__in=RawSQL(f"SELECT {slug} FROM {staging}", ()),  # noqa: S608, S611
+                ),
+            )
+        self.finish()
+        return self.imported
+
+    def insert_from_staging(self, cursor, connection, fields):
+        quote_name = connection.ops.quote_name
+        opts = Product._meta  # noqa: SLF001
+        # Every NOT NULL column needs a value: rows only update the fields
+        # they provide, and new products get the model defaults for the rest.
+        defaults = [
+            name
+            for name in (*INSERT_DEFAULT_FIELDS, *IMPORT_FIELDS)
+            if name not in fields
+        ]
+        insert_columns = [
+            opts.pk.column,
+            opts.get_field("created").column,
+            opts.get_field("modified").column,
+            *(opts.get_field(name).column for name in defaults),
+            *(opts.get_field(name).column for name in fields),
+        ]
+        select = [
+            "gen_random_uuid()",
+            "now()",
+            "now()",
+            *(["%s"] * len(defaults)),
+            *(quote_name(opts.get_field(name).column) for name in fields),
+        ]
+        params = [
+            opts.get_field(name).get_db_prep_save(
+                opts.get_field(name).get_default(),
+                connection,
+            )
+            for name in defaults
+        ]
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in (
+                quote_name(opts.get_field(name).column)
+                for name in get_update_fields(fields)
+            )
+        )
+        # Identifiers are quoted by the backend; values are passed as
+        # parameters.
+        cursor.execute(
+            f"INSERT INTO {quote_name(opts.db_table)} "  # noqa: S608
+            f"({', '.join(quote_name(column) for column in insert_columns)}) "
+            f"SELECT {', '.join(select)} FROM {quote_name(STAGING_TABLE)} "
+            f"WHERE fields = %s "
+            f"ON CONFLICT ({quote_name(opts.get_field('slug').column)}) "
+            f"DO UPDATE SET {updates}",
+            [*params, ",".join(fields)],
+        )
+        return cursor.rowcount
+
+    def finish(self):
+        # bulk_create and COPY skip the post_save signals that keep these
+        # up to date.
+        invalidate_category_counts()
+        invalidate_featured_products()
+        typeahead.invalidate()
+        # Purging every imported product one by one would take a cache
+        # round trip per row.
+        purge_surrogate_keys("home", "products")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Gera as variações redimensionadas das imagens dos produtos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenera todas as variações, e não apenas as ausentes.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.exclude(image="").only("image", "renditions")
+        generated = 0
+        for product in queryset.iterator(chunk_size=100):
+            if options["all"] or not product.image_renditions:
+                product.update_image_renditions()
+                generated += 1
+        self.stdout.write(self.style.SUCCESS(f"{generated} imagens processadas."))
@@ -0,0 +1,96 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db import router
+
+from apps.products.importers import ProductImport
+from apps.products.importers import read_rows
+from apps.products.models import Product
+
+FORMATS = ("csv", "jsonl")
+
+
+class Command(BaseCommand):
+    help = "Importa ou atualiza produtos a partir de um arquivo CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Arquivo a importar, ou '-' para ler da entrada padrão.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Formato do arquivo. Por padrão é deduzido pela extensão.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de produtos gravados por vez.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Carrega o arquivo com COPY em uma tabela temporária (PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if file_format not in FORMATS:
+            msg = "Informe o formato do arquivo com --format (csv ou jsonl)."
+            raise CommandError(msg)
+        if (
+            options["copy"]
+            and connections[router.db_for_write(Product)].vendor != "postgresql"
+        ):
+            msg = "A opção --copy só está disponível no PostgreSQL."
+            raise CommandError(msg)
+        self.started = time.monotonic()
+        if path == "-":
+            imported, product_import = self.run(sys.stdin, file_format, options)
+        else:
+            with Path(path).open(newline="", encoding="utf-8-sig") as file:
+                imported, product_import = self.run(file, file_format, options)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{imported} produtos importados, {product_import.invalid} linhas "
+                f"inválidas ({self.get_rate(product_import.read)}).",
+            ),
+        )
+
+    def run(self, file, file_format, options):
+        product_import = ProductImport(
+            read_rows(file, file_format),
+            batch_size=options["batch_size"],
+            on_error=self.write_error,
+            on_progress=self.write_progress,
+        )
+        if options["copy"]:
+            return product_import.run_copy(), product_import
+        return product_import.run(), product_import
+
+    def get_rate(self, rows):
+        elapsed = time.monotonic() - self.started
+        return f"{rows / elapsed if elapsed else 0:.0f} linhas/s"
+
+    def write_error(self, number, error):
+        if hasattr(error, "error_dict"):
+            message = "; ".join(
+                f"{field}: {' '.join(messages)}"
+                for field, messages in error.message_dict.items()
+            )
+        else:
+            message = " ".join(error.messages)
+        self.stderr.write(f"Linha {number}: {message}")
+
+    def write_progress(self, product_import):
+        self.stdout.write(
+            f"{product_import.read} linhas lidas "
+            f"({self.get_rate(product_import.read)}).",
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.search import get_search_backend
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual dos produtos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de produtos indexados por vez.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        backend = get_search_backend(Product)
+        queryset = Product.objects.order_by("pk")
+        indexed = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            backend.update_index(Product.objects.filter(pk__in=pks))
+            indexed += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f"{indexed} produtos indexados."))
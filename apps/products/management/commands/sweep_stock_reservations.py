@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.reservations import get_stock_reservations
+
+
+class Command(BaseCommand):
+    help = "Devolve ao estoque as reservas de produtos expiradas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Executa continuamente, aguardando N segundos entre varreduras.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Quantidade máxima de reservas liberadas por varredura.",
+        )
+
+    def handle(self, *args, **options):
+        reservations = get_stock_reservations()
+        while True:
+            released = reservations.sweep(limit=options["limit"])
+            self.stdout.write(f"{released} reservas expiradas liberadas.")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,22 @@
+from django.db import models
+from django.db import transaction
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+
+
+class ProductQuerySet(models.QuerySet):
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            # bulk_update skips post_save, which purges the product pages.
+            surrogate_keys = [get_surrogate_key(self.model, obj.pk) for obj in objs]
+            transaction.on_commit(
+                lambda: purge_surrogate_keys(*surrogate_keys),
+                using=self.db,
+            )
+        return rows
+
+
+ProductManager = models.Manager.from_queryset(ProductQuerySet)
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:08
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese)',
+    'ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent '
+    'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem',
+    'CREATE INDEX product_search_vector_idx ON products_product USING gin (search_vector)',
+    'CREATE INDEX product_name_trgm_idx ON products_product USING gin (name gin_trgm_ops)',
+    "UPDATE products_product SET search_vector = "
+    "setweight(to_tsvector('portuguese_unaccent', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('portuguese_unaccent', coalesce(description, '')), 'B')",
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS product_name_trgm_idx',
+    'DROP INDEX IF EXISTS product_search_vector_idx',
+    'DROP TEXT SEARCH CONFIGURATION IF EXISTS portuguese_unaccent',
+]
+
+SQLITE_FORWARD = [
+    'CREATE VIRTUAL TABLE products_product_fts USING fts5('
+    'object_id UNINDEXED, name, description, '
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    'INSERT INTO products_product_fts (object_id, name, description) '
+    'SELECT id, name, description FROM products_product',
+]
+
+SQLITE_BACKWARD = [
+    'DROP TABLE IF EXISTS products_product_fts',
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Vetor de busca'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_vendor_sql({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -1,17 +1,26 @@
 import uuid
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.urls import reverse
 from django.utils import formats
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from model_utils.models import TimeStampedModel
 
+from apps.core.jobs import enqueue
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+from apps.core.renditions import Renditions
+from apps.core.renditions import delete_renditions
+from apps.core.renditions import generate_renditions
 from apps.core.utils import get_default_product_image_url
 from apps.core.validators import FileSizeValidator
 
 from .choices import Category
+from .managers import ProductManager
 
 
 class Product(TimeStampedModel):
@@ -63,15 +72,99 @@ class Product(TimeStampedModel):
         blank=True,
         help_text=_("Tamanho máximo: 5MB. Formatos permitidos: JPG, JPEG, PNG."),
     )
+    renditions = models.JSONField(
+        verbose_name=_("Variações da imagem"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name=_("Vetor de busca"),
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
+    objects = ProductManager()
+
+    SEARCH_FIELDS = ("name", "description")
+    TYPEAHEAD_FIELDS = ("name", "slug", "category")
+    IMAGE_RENDITIONS = {
+        "thumb": (160, 160),
+        "card": (400, 400),
+        "detail": (1000, 1000),
+    }
 
     class Meta:
         verbose_name = _("Produto")
         verbose_name_plural = _("Produtos")
         ordering = ["-created"]
+        indexes = [
+            models.Index(
+                fields=["-created", "-id"],
+                name="product_created_idx",
+            ),
+            models.Index(
+                fields=["category", "-created", "-id"],
+                name="product_category_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                name="product_price_idx",
+            ),
+            models.Index(
+                fields=["category", "price", "id"],
+                name="product_category_price_idx",
+            ),
+            models.Index(
+                fields=["name", "id"],
+                name="product_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save handlers can tell whether these really changed.
+        instance._loaded_values = {  # noqa: SLF001
+            field: instance.__dict__[field]
+            for field in cls.TYPEAHEAD_FIELDS
+            if field in field_names
+        }
+        return instance
+
+    def has_changed(self, fields):
+        loaded_values = getattr(self, "_loaded_values", {})
+        return any(
+            field not in loaded_values or loaded_values[field] != getattr(self, field)
+            for field in fields
+        )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        saved_fields = kwargs.get("update_fields") or self.TYPEAHEAD_FIELDS
+        deferred_fields = self.get_deferred_fields()
+        self._loaded_values = getattr(self, "_loaded_values", {})
+        self._loaded_values.update(
+            (field, getattr(self, field))
+            for field in self.TYPEAHEAD_FIELDS
+            if field in saved_fields and field not in deferred_fields
+        )
+        if self.renditions.get("source", "") != self.image.name:
+            if self.image:
+                # Resizing runs in the run_jobs worker; placeholders are shown
+                # until it finishes.
+                enqueue(
+                    "products.update_image_renditions",
+                    product_id=str(self.pk),
+                    image=self.image.name,
+                )
+            else:
+                self.update_image_renditions()
+
     def get_price_display(self):
         return f"R$ {formats.number_format(self.price, 2)}"
 
@@ -80,6 +173,33 @@ class Product(TimeStampedModel):
             return self.image.url
         return get_default_product_image_url()
 
+    @property
+    def image_renditions(self):
+        data = (
+            self.renditions if self.renditions.get("source") == self.image.name else {}
+        )
+        return Renditions(
+            self.image.storage,
+            data,
+            self.IMAGE_RENDITIONS,
+            fallback_url=get_default_product_image_url(),
+        )
+
+    def update_image_renditions(self):
+        previous = self.renditions
+        self.renditions = (
+            generate_renditions(self.image, self.IMAGE_RENDITIONS) if self.image else {}
+        )
+        # Renditions change what the product pages render, so conditional GET
+        # validators and cached pages must see the update.
+        self.modified = timezone.now()
+        Product.objects.filter(pk=self.pk).update(
+            renditions=self.renditions,
+            modified=self.modified,
+        )
+        purge_surrogate_keys(get_surrogate_key(Product, self.pk))
+        delete_renditions(self.image.storage, previous)
+
     @property
     def in_stock(self):
         return self.stock > 0
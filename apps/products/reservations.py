@@ -0,0 +1,295 @@
+import logging
+import threading
+import time
+import uuid
+from typing import NamedTuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "stock_reservations"
+SWEEP_LIMIT = 100
+
+# Shared by every script: returns the hold's quantity to the product counter and
+# forgets the hold. KEYS = reserved counters, holds, expiry index. Holds are
+# stored as "<product_id>:<quantity>:<owner>". Scripts return the products
+# whose holds they released, so their cached pages can be purged.
+RELEASE_FUNCTION = """
+local function release(reservation_id)
+  local hold = redis.call("HGET", KEYS[2], reservation_id)
+  if not hold then
+    return false
+  end
+  local product_id, quantity = string.match(hold, "^([^:]+):(%d+)")
+  local reserved = redis.call("HINCRBY", KEYS[1], product_id, -tonumber(quantity))
+  if reserved <= 0 then
+    redis.call("HDEL", KEYS[1], product_id)
+  end
+  redis.call("HDEL", KEYS[2], reservation_id)
+  redis.call("ZREM", KEYS[3], reservation_id)
+  return product_id
+end
+
+local function sweep(now, limit)
+  local expired = redis.call("ZRANGEBYSCORE", KEYS[3], "-inf", now, "LIMIT", 0, limit)
+  local released = {}
+  for _, reservation_id in ipairs(expired) do
+    local product_id = release(reservation_id)
+    if product_id then
+      table.insert(released, product_id)
+    end
+  end
+  return released
+end
+"""
+
+# Returns {1 or 0, swept product ids...}.
+RESERVE_SCRIPT = (
+    RELEASE_FUNCTION
+    + """
+local product_id, quantity, stock = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local reservation_id, now, expires_at = ARGV[4], ARGV[5], ARGV[6]
+local hold = product_id .. ":" .. quantity .. ":" .. ARGV[8]
+local result = sweep(now, tonumber(ARGV[7]))
+local reserved = tonumber(redis.call("HGET", KEYS[1], product_id) or "0")
+if stock - reserved < quantity then
+  table.insert(result, 1, 0)
+  return result
+end
+redis.call("HINCRBY", KEYS[1], product_id, quantity)
+redis.call("HSET", KEYS[2], reservation_id, hold)
+redis.call("ZADD", KEYS[3], expires_at, reservation_id)
+table.insert(result, 1, 1)
+return result
+"""
+)
+
+RELEASE_SCRIPT = RELEASE_FUNCTION + "return release(ARGV[1])"
+
+SWEEP_SCRIPT = RELEASE_FUNCTION + "return sweep(ARGV[1], tonumber(ARGV[2]))"
+
+
+def get_reservation_ttl():
+    return getattr(settings, "STOCK_RESERVATION_TTL", 15 * 60)
+
+
+def get_owner_key(user):
+    return str(user.pk) if user is not None and user.pk else ""
+
+
+def purge_product_pages(product_ids):
+    purge_surrogate_keys(
+        *(get_surrogate_key(Product, product_id) for product_id in set(product_ids)),
+    )
+
+
+class Hold(NamedTuple):
+    product_id: str
+    quantity: int
+    expires_at: float
+    owner: str
+
+
+class RedisReservationStore:
+    def __init__(self, client):
+        self.client = client
+        self.keys = [
+            f"{KEY_PREFIX}:reserved",
+            f"{KEY_PREFIX}:holds",
+            f"{KEY_PREFIX}:expiry",
+        ]
+        self._reserve = client.register_script(RESERVE_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self._sweep = client.register_script(SWEEP_SCRIPT)
+
+    def reserve(self, reservation_id, hold, stock):
+        args = [
+            hold.product_id,
+            hold.quantity,
+            stock,
+            reservation_id,
+            time.time(),
+            hold.expires_at,
+            SWEEP_LIMIT,
+            hold.owner,
+        ]
+        reserved, *released = self._reserve(keys=self.keys, args=args)
+        return bool(reserved), [product_id.decode() for product_id in released]
+
+    def release(self, reservation_id):
+        product_id = self._release(keys=self.keys, args=[reservation_id])
+        return product_id.decode() if product_id else None
+
+    def sweep(self, limit):
+        released = self._sweep(keys=self.keys, args=[time.time(), limit])
+        return [product_id.decode() for product_id in released]
+
+    def get_reserved(self, product_ids):
+        values = self.client.hmget(self.keys[0], product_ids)
+        return {
+            product_id: int(value or 0)
+            for product_id, value in zip(product_ids, values, strict=True)
+        }
+
+    def get_holds(self, reservation_ids):
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hmget(self.keys[1], reservation_ids)
+        pipeline.zmscore(self.keys[2], reservation_ids)
+        values, expiries = pipeline.execute()
+        holds = {}
+        for reservation_id, value, expires_at in zip(
+            reservation_ids,
+            values,
+            expiries,
+            strict=True,
+        ):
+            if value is None or expires_at is None:
+                continue
+            # Holds taken before owners were recorded have no owner part.
+            product_id, quantity, *owner = value.decode().split(":", 2)
+            holds[reservation_id] = Hold(
+                product_id,
+                int(quantity),
+                expires_at,
+                owner[0] if owner else "",
+            )
+        return holds
+
+
+class LocalReservationStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reserved = {}
+        self.holds = {}
+
+    def _release(self, reservation_id):
+        hold = self.holds.pop(reservation_id, None)
+        if hold is None:
+            return None
+        self.reserved[hold.product_id] -= hold.quantity
+        if self.reserved[hold.product_id] <= 0:
+            del self.reserved[hold.product_id]
+        return hold.product_id
+
+    def _sweep(self, limit):
+        now = time.time()
+        expired = [
+            reservation_id
+            for reservation_id, hold in self.holds.items()
+            if hold.expires_at <= now
+        ][:limit]
+        released = (self._release(reservation_id) for reservation_id in expired)
+        return [product_id for product_id in released if product_id is not None]
+
+    def reserve(self, reservation_id, hold, stock):
+        with self.lock:
+            released = self._sweep(SWEEP_LIMIT)
+            reserved = self.reserved.get(hold.product_id, 0)
+            if stock - reserved < hold.quantity:
+                return False, released
+            self.reserved[hold.product_id] = reserved + hold.quantity
+            self.holds[reservation_id] = hold
+            return True, released
+
+    def release(self, reservation_id):
+        with self.lock:
+            return self._release(reservation_id)
+
+    def sweep(self, limit):
+        with self.lock:
+            return self._sweep(limit)
+
+    def get_reserved(self, product_ids):
+        with self.lock:
+            return {
+                product_id: self.reserved.get(product_id, 0)
+                for product_id in product_ids
+            }
+
+    def get_holds(self, reservation_ids):
+        with self.lock:
+            return {
+                reservation_id: self.holds[reservation_id]
+                for reservation_id in reservation_ids
+                if reservation_id in self.holds
+            }
+
+
+class StockReservations:
+    def __init__(self, store):
+        self.store = store
+
+    def reserve(self, product, quantity, ttl=None, *, owner=None):
+        reservation_id = uuid.uuid4().hex
+        expires_at = time.time() + (ttl or get_reservation_ttl())
+        hold = Hold(str(product.pk), quantity, expires_at, get_owner_key(owner))
+        reserved, released = self.store.reserve(reservation_id, hold, product.stock)
+        # Product pages show the stock left after holds.
+        purge_product_pages([*released, hold.product_id] if reserved else released)
+        return reservation_id if reserved else None
+
+    def release(self, reservation_id):
+        product_id = self.store.release(reservation_id)
+        if product_id is None:
+            return False
+        purge_product_pages([product_id])
+        return True
+
+    def sweep(self, limit=1000):
+        released = self.store.sweep(limit)
+        purge_product_pages(released)
+        return len(released)
+
+    def get_reserved(self, product_ids, *, sweep=False):
+        product_ids = [str(product_id) for product_id in product_ids]
+        if not product_ids:
+            return {}
+        try:
+            if sweep:
+                purge_product_pages(self.store.sweep(SWEEP_LIMIT))
+            return self.store.get_reserved(product_ids)
+        except RedisError:
+            logger.warning("Could not read stock reservations", exc_info=True)
+            return dict.fromkeys(product_ids, 0)
+
+    def get_holds(self, reservation_ids, owner):
+        # Expired holds, holds without an owner and holds taken by someone else
+        # are left out, so nobody can spend another customer's reservation.
+        owner_key = get_owner_key(owner)
+        reservation_ids = [str(reservation_id) for reservation_id in reservation_ids]
+        if not owner_key or not reservation_ids:
+            return {}
+        try:
+            holds = self.store.get_holds(reservation_ids)
+        except RedisError:
+            logger.warning("Could not read stock reservations", exc_info=True)
+            return {}
+        now = time.time()
+        return {
+            reservation_id: hold
+            for reservation_id, hold in holds.items()
+            if hold.owner == owner_key and hold.expires_at > now
+        }
+
+    def get_available(self, product):
+        reserved = self.get_reserved([product.pk])[str(product.pk)]
+        return max(product.stock - reserved, 0)
+
+
+_local_store = LocalReservationStore()
+
+
+def get_stock_reservations():
+    try:
+        client = get_redis_connection("default")
+    except NotImplementedError:
+        return StockReservations(_local_store)
+    return StockReservations(RedisReservationStore(client))
@@ -0,0 +1,46 @@
+from django.db.models import Count
+from django.db.models import Q
+
+from apps.core.computations import cached_computation
+
+from .models import Product
+
+CATEGORY_COUNTS_CACHE_KEY = "products:category_counts"
+# Stock changes made through queryset updates (checkout, restock) do not send
+# signals, so the counts also expire on their own.
+CATEGORY_COUNTS_TIMEOUT = 5 * 60
+FEATURED_PRODUCTS_CACHE_KEY = "products:featured"
+FEATURED_PRODUCTS_TIMEOUT = 5 * 60
+FEATURED_PRODUCTS_COUNT = 8
+
+
+@cached_computation(CATEGORY_COUNTS_CACHE_KEY, CATEGORY_COUNTS_TIMEOUT)
+def get_category_counts():
+    return {
+        row["category"]: (row["total"], row["in_stock"])
+        for row in Product.objects.order_by()
+        .values("category")
+        .annotate(
+            total=Count("pk"),
+            in_stock=Count("pk", filter=Q(stock__gt=0)),
+        )
+    }
+
+
+def invalidate_category_counts():
+    get_category_counts.invalidate()
+
+
+# Only the ids are cached; the products themselves are loaded per request, so
+# stock and edits show up without invalidating the list.
+@cached_computation(FEATURED_PRODUCTS_CACHE_KEY, FEATURED_PRODUCTS_TIMEOUT)
+def get_featured_product_ids():
+    return list(
+        Product.objects.order_by("-created").values_list("pk", flat=True)[
+            :FEATURED_PRODUCTS_COUNT
+        ],
+    )
+
+
+def invalidate_featured_products():
+    get_featured_product_ids.invalidate()
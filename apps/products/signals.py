@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import purge_surrogate_keys
+from apps.core.search import get_search_backend
+
+from .models import Product
+from .services import invalidate_category_counts
+from .services import invalidate_featured_products
+from .typeahead import typeahead
+
+
+@receiver(post_save, sender=Product)
+def update_product_search_index(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and update_fields.isdisjoint(Product.SEARCH_FIELDS):
+        return
+    backend = get_search_backend(Product)
+    backend.update_index(Product.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search_index(sender, instance, **kwargs):
+    get_search_backend(Product).remove_from_index([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_facets(sender, instance, **kwargs):
+    invalidate_category_counts()
+
+
+@receiver(post_save, sender=Product)
+def invalidate_typeahead_on_save(sender, instance, **kwargs):
+    # Every save would otherwise rebuild the index in every worker, e.g. each
+    # stock or price change made in the admin.
+    fields = Product.TYPEAHEAD_FIELDS
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if kwargs.get("created") or instance.has_changed(fields):
+        typeahead.invalidate()
+
+
+@receiver(post_delete, sender=Product)
+def invalidate_typeahead_on_delete(sender, instance, **kwargs):
+    typeahead.invalidate()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def purge_product_pages(sender, instance, **kwargs):
+    surrogate_keys = [get_surrogate_key(Product, instance.pk)]
+    if kwargs.get("created"):
+        # New products show up in the home page grid.
+        invalidate_featured_products()
+        surrogate_keys.append("home")
+    purge_surrogate_keys(*surrogate_keys)
@@ -0,0 +1,15 @@
+from apps.core.jobs import task
+
+from .models import Product
+
+
+@task("products.update_image_renditions")
+def update_image_renditions(product_id, image):
+    product = Product.objects.filter(pk=product_id).first()
+    # The image may have been replaced again, or already processed, since the
+    # job was queued.
+    if product is None or product.image.name != image:
+        return
+    if product.renditions.get("source") == image:
+        return
+    product.update_image_renditions()
@@ -0,0 +1,10 @@
+from django import template
+
+from apps.products.cards import render_product_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_cards(products, sizes="50vw", *, cart=False):
+    return render_product_cards(products, sizes, cart=cart)
@@ -0,0 +1,247 @@
+import io
+import time
+from decimal import Decimal
+from http import HTTPStatus
+from unittest import mock
+from unittest import skipUnless
+
+import fakeredis
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.pagecache import get_surrogate_key
+from apps.core.pagecache import get_surrogate_key_versions
+from apps.users.models import User
+
+from .importers import ProductImport
+from .importers import read_rows
+from .models import Product
+from .reservations import LocalReservationStore
+from .reservations import RedisReservationStore
+from .reservations import StockReservations
+from .typeahead import typeahead
+
+
+def create_products(count, start=0):
+    return [
+        Product.objects.create(
+            name=f"Produto {i}",
+            slug=f"produto-{i}",
+            category="OTHER",
+            price=Decimal("10.00"),
+            stock=i % 2,
+        )
+        for i in range(start, start + count)
+    ]
+
+
+class ProductGridQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_query_count_does_not_grow_with_products(self):
+        urls = [reverse("home:index"), reverse("products:product_list")]
+        for count in (1, 30):
+            create_products(count, start=Product.objects.count())
+            for url in urls:
+                # Start cold, so neither the page nor the cards come from
+                # the cache.
+                cache.clear()
+                with self.assertNumQueries(4):
+                    response = self.client.get(url)
+                assert response.status_code == HTTPStatus.OK
+
+
+class ProductBulkUpdateTests(TestCase):
+    def test_bulk_update_purges_product_pages(self):
+        products = create_products(2)
+        surrogate_keys = [
+            get_surrogate_key(Product, product.pk) for product in products
+        ]
+        versions = get_surrogate_key_versions(surrogate_keys)
+        for product in products:
+            product.stock = 5
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.bulk_update(products, ["stock"])
+        assert get_surrogate_key_versions(surrogate_keys) == {
+            key: version + 1 for key, version in versions.items()
+        }
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = create_products(1)[0]
+        self.product.stock = 5
+        self.user = User.objects.create_user(email="cliente@example.com")
+        self.reservations = StockReservations(self.get_store())
+        self.now = time.time()
+        patcher = mock.patch(
+            "apps.products.reservations.time.time",
+            side_effect=lambda: self.now,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_store(self):
+        return RedisReservationStore(fakeredis.FakeRedis())
+
+    def get_reserved(self):
+        return self.reservations.get_reserved([self.product.pk])[str(self.product.pk)]
+
+    def test_reserve_holds_stock_until_it_runs_out(self):
+        assert self.reservations.reserve(self.product, 3)
+        assert self.reservations.reserve(self.product, 2)
+        assert self.reservations.reserve(self.product, 1) is None
+        assert self.get_reserved() == self.product.stock
+        assert self.reservations.get_available(self.product) == 0
+
+    def test_release_returns_the_hold_once(self):
+        reservation_id = self.reservations.reserve(self.product, 3)
+        assert self.reservations.release(reservation_id)
+        assert not self.reservations.release(reservation_id)
+        assert self.get_reserved() == 0
+        assert self.reservations.get_available(self.product) == self.product.stock
+
+    def test_expired_holds_are_swept(self):
+        self.reservations.reserve(self.product, 2, ttl=60)
+        self.reservations.reserve(self.product, 1, ttl=600)
+        self.now += 61
+        assert self.reservations.sweep() == 1
+        assert self.get_reserved() == 1
+        assert self.reservations.sweep() == 0
+
+    def test_reserve_sweeps_expired_holds_first(self):
+        self.reservations.reserve(self.product, self.product.stock, ttl=60)
+        assert self.reservations.reserve(self.product, 1) is None
+        self.now += 61
+        assert self.reservations.reserve(self.product, self.product.stock)
+
+    def test_holds_are_only_returned_to_their_owner(self):
+        reservation_id = self.reservations.reserve(self.product, 2, owner=self.user)
+        anonymous_id = self.reservations.reserve(self.product, 1)
+        other_user = User.objects.create_user(email="outro@example.com")
+        ids = [reservation_id, anonymous_id]
+        holds = self.reservations.get_holds(ids, owner=self.user)
+        assert list(holds) == [reservation_id]
+        assert holds[reservation_id].quantity == 2  # noqa: PLR2004
+        assert self.reservations.get_holds(ids, owner=other_user) == {}
+        assert self.reservations.get_holds(ids, owner=None) == {}
+        self.now += 60 * 60
+        assert self.reservations.get_holds(ids, owner=self.user) == {}
+
+    def test_holds_purge_the_product_page(self):
+        surrogate_key = get_surrogate_key(Product, self.product.pk)
+
+        def get_version():
+            return get_surrogate_key_versions([surrogate_key])[surrogate_key]
+
+        version = get_version()
+        reservation_id = self.reservations.reserve(self.product, 2, ttl=60)
+        assert get_version() == version + 1
+        self.reservations.release(reservation_id)
+        assert get_version() == version + 2
+        self.reservations.reserve(self.product, 2, ttl=60)
+        self.now += 61
+        assert self.reservations.sweep() == 1
+        assert get_version() == version + 4
+
+    def test_detail_page_shows_available_stock(self):
+        self.product.save()
+        self.reservations.reserve(self.product, 4)
+        with mock.patch(
+            "apps.products.views.get_stock_reservations",
+            return_value=self.reservations,
+        ):
+            response = self.client.get(self.product.get_absolute_url())
+        assert response.context["available_stock"] == 1
+
+
+class LocalStockReservationTests(StockReservationTests):
+    def get_store(self):
+        return LocalReservationStore()
+
+
+class TypeaheadInvalidationTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(typeahead, "invalidate")
+        self.invalidate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_and_renamed_products_invalidate_the_index(self):
+        product = create_products(1)[0]
+        self.invalidate.assert_called_once()
+        product = Product.objects.get(pk=product.pk)
+        product.name = "Caneca"
+        product.save()
+        assert self.invalidate.call_count == 2  # noqa: PLR2004
+
+    def test_other_changes_keep_the_index(self):
+        product = create_products(1)[0]
+        self.invalidate.reset_mock()
+        product.price = Decimal("12.00")
+        product.save()
+        product = Product.objects.get(pk=product.pk)
+        product.stock = 3
+        product.save(update_fields=["stock"])
+        product.category = product.category
+        product.save()
+        product = Product.objects.only("pk", "stock").get(pk=product.pk)
+        product.stock = 2
+        product.save()
+        self.invalidate.assert_not_called()
+
+
+class ProductImportTests(TestCase):
+    csv = (
+        "slug,name,category,price\n"
+        "caneca,Caneca azul,OTHER,12.00\n"
+        "camiseta,Camiseta,OTHER,59.90\n"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            name="Caneca",
+            slug="caneca",
+            category="OTHER",
+            price=Decimal("10.00"),
+            stock=7,
+            description="Caneca de cerâmica.",
+        )
+
+    def run_import(self, text):
+        return ProductImport(read_rows(io.StringIO(text), "csv")).run()
+
+    def test_columns_left_out_of_the_file_are_kept(self):
+        assert self.run_import(self.csv) == 2  # noqa: PLR2004
+        self.product.refresh_from_db()
+        assert self.product.name == "Caneca azul"
+        assert self.product.price == Decimal("12.00")
+        assert self.product.stock == 7  # noqa: PLR2004
+        assert self.product.description == "Caneca de cerâmica."
+        new_product = Product.objects.get(slug="camiseta")
+        assert new_product.stock == 0
+        assert new_product.description == ""
+        assert new_product.renditions == {}
+        assert not new_product.image
+
+    def test_empty_cells_reset_the_column(self):
+        self.run_import("slug,name,category,price,stock\ncaneca,Caneca,OTHER,10,\n")
+        self.product.refresh_from_db()
+        assert self.product.stock == 0
+
+    def test_import_purges_product_pages(self):
+        versions = get_surrogate_key_versions(["home", "products"])
+        self.run_import(self.csv)
+        assert get_surrogate_key_versions(["home", "products"]) == {
+            key: version + 1 for key, version in versions.items()
+        }
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY só existe no PostgreSQL.")
+class ProductCopyImportTests(ProductImportTests):
+    def run_import(self, text):
+        return ProductImport(read_rows(io.StringIO(text), "csv")).run_copy()
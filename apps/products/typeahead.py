@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import connections
+
+from .choices import Category
+from .models import Product
+
+VERSION_CACHE_KEY = "products:typeahead_version"
+VERSION_CHECK_INTERVAL = 5
+SUGGESTIONS_LIMIT = 8
+
+# Each entry packs the product position and the offset of a word inside its
+# folded text into one integer, so the index is a flat array instead of a
+# list of tuples.
+OFFSET_BITS = 8
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+CATEGORIES = list(Category)
+CATEGORY_POSITIONS = {
+    category.value: position for position, category in enumerate(CATEGORIES)
+}
+
+
+def fold(text):
+    normalized = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in normalized if not unicodedata.combining(char))
+    return NON_WORD_RE.sub(" ", text.casefold()).strip()
+
+
+class TypeaheadIndex:
+    def __init__(self, rows):
+        self.names = []
+        self.slugs = []
+        self.categories = array("B")
+        self.texts = []
+        entries = array("Q")
+        for position, (name, slug, category) in enumerate(rows):
+            text = fold(name)
+            words = set(text.split())
+            extra = [word for word in slug.split("-") if word and word not in words]
+            if extra:
+                text = " ".join([text, *extra])
+            self.names.append(name)
+            self.slugs.append(slug)
+            self.categories.append(
+                CATEGORY_POSITIONS.get(category, CATEGORY_POSITIONS[Category.OTHER]),
+            )
+            self.texts.append(text)
+            entries.extend(
+                position << OFFSET_BITS | offset for offset in self._word_offsets(text)
+            )
+        self.entries = array("Q", sorted(entries, key=self._get_key))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _word_offsets(self, text):
+        if text:
+            yield 0
+        for match in re.finditer(" ", text):
+            if match.end() > OFFSET_MASK:
+                break
+            yield match.end()
+
+    def _get_key(self, entry):
+        return self.texts[entry >> OFFSET_BITS][entry & OFFSET_MASK :]
+
+    def search(self, query, limit=SUGGESTIONS_LIMIT):
+        prefix = fold(query)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        start = bisect_left(self.entries, prefix, key=self._get_key)
+        for index in range(start, len(self.entries)):
+            entry = self.entries[index]
+            position = entry >> OFFSET_BITS
+            if not self.texts[position].startswith(prefix, entry & OFFSET_MASK):
+                break
+            if position in seen:
+                continue
+            seen.add(position)
+            results.append(
+                {
+                    "name": self.names[position],
+                    "slug": self.slugs[position],
+                    "category": CATEGORIES[self.categories[position]],
+                },
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+
+class Typeahead:
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.rebuilding = False
+
+    def get_version(self):
+        return cache.get(VERSION_CACHE_KEY, 0)
+
+    def build(self):
+        with self.build_lock:
+            version = self.get_version()
+            if self.index is not None and version == self.version:
+                return
+            rows = (
+                Product.objects.order_by()
+                .values_list("name", "slug", "category")
+                .iterator(chunk_size=5000)
+            )
+            self.index = TypeaheadIndex(rows)
+            self.version = version
+            self.checked_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        finally:
+            self.rebuilding = False
+            connections.close_all()
+
+    def rebuild_in_background(self):
+        with self.lock:
+            if self.rebuilding:
+                return
+            self.rebuilding = True
+        threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def get_index(self):
+        if self.index is None:
+            self.build()
+        elif time.monotonic() - self.checked_at > VERSION_CHECK_INTERVAL:
+            # Other workers learn about catalog changes through the shared
+            # version; the current index keeps serving while it is rebuilt.
+            self.checked_at = time.monotonic()
+            if self.get_version() != self.version:
+                self.rebuild_in_background()
+        return self.index
+
+    def invalidate(self):
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, None)
+        self.checked_at = 0.0
+
+    def suggest(self, query, limit=SUGGESTIONS_LIMIT):
+        return self.get_index().search(query, limit)
+
+
+typeahead = Typeahead()
+
+
+def suggest_categories(query, limit=3):
+    prefix = fold(query)
+    if not prefix:
+        return []
+    return [
+        category
+        for category in CATEGORIES
+        if f" {prefix}" in f" {fold(str(category.label))}"
+    ][:limit]
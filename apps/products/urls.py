@@ -1,10 +1,22 @@
 from django.urls import path
 
 from .views import ProductDetailView
+from .views import ProductListView
+from .views import ProductSuggestionsView
 
 app_name = "products"
 
 urlpatterns = [
+    path(
+        route="",
+        view=ProductListView.as_view(),
+        name="product_list",
+    ),
+    path(
+        route="search/suggestions/",
+        view=ProductSuggestionsView.as_view(),
+        name="product_suggestions",
+    ),
     path(
         route="<slug>/",
         view=ProductDetailView.as_view(),
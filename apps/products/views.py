@@ -1,8 +1,133 @@
 from django.views.generic import DetailView
+from django.views.generic import ListView
+from django.views.generic import TemplateView
 
+from apps.core.pagecache import get_surrogate_key
+from apps.core.viewmixins import ConditionalGetMixin
+from apps.core.viewmixins import CursorPaginationMixin
+from apps.core.viewmixins import HtmxTemplateMixin
+from apps.core.viewmixins import SearchMixin
+from apps.core.viewmixins import SurrogateKeyMixin
+
+from .choices import Category
+from .choices import ProductSort
+from .forms import ProductFilterForm
 from .models import Product
+from .reservations import get_stock_reservations
+from .services import get_category_counts
+from .typeahead import suggest_categories
+from .typeahead import typeahead
+
+
+class ProductListView(
+    HtmxTemplateMixin,
+    SearchMixin,
+    CursorPaginationMixin,
+    ListView,
+):
+    model = Product
+    template_name = "products/product_list.html"
+    htmx_template_name = "products/partials/product_catalog.html"
+    context_object_name = "products"
+    paginate_by = 24
+    search_fields = ["name", "description"]
+    sort_orderings = {
+        ProductSort.NEWEST: ("-created", "-id"),
+        ProductSort.PRICE_ASC: ("price", "id"),
+        ProductSort.PRICE_DESC: ("-price", "-id"),
+        ProductSort.NAME: ("name", "id"),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        self.filter_form = ProductFilterForm(self.request.GET)
+        self.filter_form.is_valid()
+        filters = self.filter_form.cleaned_data
+        if filters.get("category"):
+            queryset = queryset.filter(category=filters["category"])
+        if filters.get("min_price") is not None:
+            queryset = queryset.filter(price__gte=filters["min_price"])
+        if filters.get("max_price") is not None:
+            queryset = queryset.filter(price__lte=filters["max_price"])
+        if filters.get("in_stock"):
+            queryset = queryset.filter(stock__gt=0)
+        return queryset
+
+    def get_cursor_ordering(self):
+        sort = self.filter_form.cleaned_data.get("sort") or ProductSort.RELEVANCE
+        if sort == ProductSort.RELEVANCE:
+            if "search_rank" in self.object_list.query.annotations:
+                return ("-search_rank", "-id")
+            sort = ProductSort.NEWEST
+        return self.sort_orderings[sort]
+
+    def get_category_facets(self):
+        counts = get_category_counts()
+        filters = self.filter_form.cleaned_data
+        query_dict = self.request.GET.copy()
+        query_dict.pop(self.cursor_param, None)
+        facets = []
+        for value, label in Category.choices:
+            total, in_stock = counts.get(value, (0, 0))
+            query_dict["category"] = value
+            facets.append(
+                {
+                    "value": value,
+                    "label": label,
+                    "count": in_stock if filters.get("in_stock") else total,
+                    "query_string": query_dict.urlencode(),
+                    "active": filters.get("category") == value,
+                },
+            )
+        query_dict.pop("category")
+        return facets, query_dict.urlencode()
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        facets, all_categories_query_string = self.get_category_facets()
+        context["filter_form"] = self.filter_form
+        context["category_facets"] = facets
+        context["all_categories_query_string"] = all_categories_query_string
+        return context
 
-class ProductDetailView(DetailView):
+
+class ProductDetailView(SurrogateKeyMixin, ConditionalGetMixin, DetailView):
     model = Product
     template_name = "products/product_detail.html"
+
+    def get_validators(self):
+        row = (
+            Product.objects.filter(slug=self.kwargs[self.slug_url_kwarg])
+            .values_list("pk", "modified", "stock")
+            .first()
+        )
+        if row is None:
+            return None, ()
+        pk, modified, stock = row
+        # Stock moves through queryset updates and reservations, neither of
+        # which touches modified.
+        reserved = get_stock_reservations().get_reserved([pk])[str(pk)]
+        return modified, [stock > reserved]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        reservations = get_stock_reservations()
+        context["available_stock"] = reservations.get_available(self.object)
+        return context
+
+    def get_surrogate_keys(self):
+        # "products" is purged by bulk writes such as imports.
+        return [get_surrogate_key(Product, self.object.pk), "products"]
+
+
+class ProductSuggestionsView(TemplateView):
+    template_name = "products/partials/product_suggestions.html"
+    search_param = "q"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get(self.search_param, "").strip()
+        context["q"] = query
+        context["suggestions"] = typeahead.suggest(query) if query else []
+        context["category_suggestions"] = suggest_categories(query)
+        return context
@@ -136,12 +136,14 @@ MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "apps.core.middleware.UploadLimitMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "apps.core.middleware.PageCacheMiddleware",
 ]
 
 # -----------------------------------------------------------------------------
@@ -161,6 +163,26 @@ STATICFILES_FINDERS = [
 MEDIA_ROOT = str(BASE_DIR / "media")
 MEDIA_URL = "/media/"
 
+# -----------------------------------------------------------------------------
+# UPLOADS
+# -----------------------------------------------------------------------------
+FILE_UPLOAD_HANDLERS = [
+    "apps.core.uploadhandlers.LimitedUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+UPLOAD_DEFAULT_MAX_SIZE = 10 * 1024 * 1024
+UPLOAD_LIMITS = {
+    "image": {
+        "max_size": 5 * 1024 * 1024,
+        "content_types": ["image/jpeg", "image/png"],
+    },
+    "profile_picture": {
+        "max_size": 5 * 1024 * 1024,
+        "content_types": ["image/jpeg", "image/png"],
+    },
+}
+
 # -----------------------------------------------------------------------------
 # TEMPLATES
 # -----------------------------------------------------------------------------
@@ -180,6 +202,7 @@ TEMPLATES = [
                 "django.template.context_processors.tz",
                 "django.contrib.messages.context_processors.messages",
                 "apps.users.context_processors.allauth_settings",
+                "apps.core.context_processors.page_cache",
             ],
         },
     },
@@ -227,6 +250,23 @@ MESSAGE_TAGS = {
     messages.ERROR: "danger",
 }
 
+# -----------------------------------------------------------------------------
+# PAGE CACHE
+# -----------------------------------------------------------------------------
+PAGE_CACHE_TIMEOUT = env.int("DJANGO_PAGE_CACHE_TIMEOUT", default=60 * 10)
+# Query parameters that select a different cached page. Requests carrying any
+# other parameter, besides the ignored tracking ones, skip the cache.
+PAGE_CACHE_QUERY_PARAMS = []
+PAGE_CACHE_IGNORED_QUERY_PARAMS = [
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+    "utm_term",
+    "utm_content",
+    "fbclid",
+    "gclid",
+]
+
 # -----------------------------------------------------------------------------
 # redis
 # -----------------------------------------------------------------------------
@@ -263,3 +303,14 @@ COTTON_DIR = "components"
 # -----------------------------------------------------------------------------
 PHONENUMBER_DEFAULT_FORMAT = "NATIONAL"
 PHONENUMBER_DEFAULT_REGION = "BR"
+
+# -----------------------------------------------------------------------------
+# orders
+# -----------------------------------------------------------------------------
+ORDERS_ARCHIVE_AFTER_DAYS = env.int("DJANGO_ORDERS_ARCHIVE_AFTER_DAYS", default=365)
+# Sales rollups re-read orders modified this long before the previous run, so
+# transactions still open while it ran are not missed.
+ORDERS_ROLLUP_WATERMARK_MARGIN = env.int(
+    "DJANGO_ORDERS_ROLLUP_WATERMARK_MARGIN",
+    default=15 * 60,
+)
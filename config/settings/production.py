@@ -28,11 +28,19 @@ DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 # -----------------------------------------------------------------------------
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "apps.core.cache.TwoTierCache",
         "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "IGNORE_EXCEPTIONS": True,
+            "LOCAL_MAX_ENTRIES": env.int(
+                "DJANGO_CACHE_LOCAL_MAX_ENTRIES",
+                default=5000,
+            ),
+            "LOCAL_TIMEOUT": env.int("DJANGO_CACHE_LOCAL_TIMEOUT", default=60),
+            "LOCAL_NAMESPACES": ["products", "cards", "surrogate"],
+            "WRITE_ONCE_NAMESPACES": ["cards"],
+            "VERSION_CHECK_INTERVAL": 1,
         },
     },
 }
@@ -84,10 +92,13 @@ aws_s3_domain = AWS_S3_CUSTOM_DOMAIN or f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws
 # -----------------------------------------------------------------------------
 STORAGES = {
     "default": {
-        "BACKEND": "storages.backends.s3.S3Storage",
+        "BACKEND": "apps.core.storages.ContentAddressedStorage",
         "OPTIONS": {
-            "location": "media",
-            "file_overwrite": False,
+            "backend": "storages.backends.s3.S3Storage",
+            "options": {
+                "location": "media",
+                "file_overwrite": False,
+            },
         },
     },
     "staticfiles": {
@@ -9,3 +9,8 @@ sys.path.append(str(BASE_DIR / "apps"))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
 application = get_wsgi_application()
+
+# Build the in-memory typeahead index while the worker starts accepting requests.
+from apps.products.typeahead import typeahead  # noqa: E402
+
+typeahead.rebuild_in_background()